@@ -12,8 +12,9 @@ bl_info = {
 
 ########################## Divider ##########################
 from . import panel
+from .通用工具 import 权重矩阵, 骨架索引
 from .骨骼工具 import 骨骼与顶点组, 骨骼姿态操作, 骨骼编辑操作, MOD骨架替换
-from .属性工具 import 顶点组, 形态键, UV贴图, 顶点色
+from .属性工具 import 顶点组, 顶点组分析, 形态键, UV贴图, 顶点色
 from .其他工具 import 其他
 
 
@@ -21,11 +22,14 @@ from .其他工具 import 其他
 # 注册插件
 def register():
     panel.register()
+    权重矩阵.register()
+    骨架索引.register()
     骨骼与顶点组.register()
     骨骼姿态操作.register()
     骨骼编辑操作.register()
     MOD骨架替换.register()
     顶点组.register()
+    顶点组分析.register()
     形态键.register()
     UV贴图.register()
     顶点色.register()
@@ -34,11 +38,14 @@ def register():
 # 注销插件
 def unregister():
     panel.unregister()
+    权重矩阵.unregister()
+    骨架索引.unregister()
     骨骼与顶点组.unregister()
     骨骼姿态操作.unregister()
     骨骼编辑操作.unregister()
     MOD骨架替换.unregister()
     顶点组.unregister()
+    顶点组分析.unregister()
     形态键.unregister()
     UV贴图.unregister()
     顶点色.unregister()
@@ -1,8 +1,15 @@
 # type: ignore
 import bpy
 import numpy as np
+import os
 import time
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 from typing import Dict, Tuple, Set, List, Optional
+from ..通用工具.匹配算法 import assign_by_features, similarity_to_distance, apply_renames
+from ..通用工具.形态键数据 import delta_fingerprints, reorder_shape_keys, export_shape_key_deltas, import_shape_key_deltas
+from ..通用工具.形态键数据 import vertex_group_mask, transfer_shape_keys, clean_shape_keys, split_shape_keys
+from ..通用工具.权重传递 import SurfaceProjector
+from ..通用工具.镜像 import get_side_weights, parse_mirror_patterns, mirror_name
 
 class DATA_PT_shape_key_tools(bpy.types.Panel):
     bl_label = "形态键"
@@ -24,11 +31,18 @@ class DATA_PT_shape_key_tools(bpy.types.Panel):
         row = col.row(align=True)
         row.operator(O_ShapeKeysSortMatch.bl_idname, text=O_ShapeKeysSortMatch.bl_label, icon="SORTSIZE")
         row.operator(O_ShapeKeysRenameByOrder.bl_idname, text=O_ShapeKeysRenameByOrder.bl_label, icon="SORTALPHA")
+        row = col.row(align=True)
+        row.operator(O_ShapeKeysTransfer.bl_idname, text=O_ShapeKeysTransfer.bl_label, icon="MOD_DATA_TRANSFER")
+        row.operator(O_ShapeKeysClean.bl_idname, text=O_ShapeKeysClean.bl_label, icon="BRUSH_DATA")
+        row.operator(O_ShapeKeysSplitLR.bl_idname, text=O_ShapeKeysSplitLR.bl_label, icon="MOD_MIRROR")
+        row = col.row(align=True)
+        row.operator(O_ShapeKeysExportDeltas.bl_idname, text=O_ShapeKeysExportDeltas.bl_label, icon="EXPORT")
+        row.operator(O_ShapeKeysImportDeltas.bl_idname, text=O_ShapeKeysImportDeltas.bl_label, icon="IMPORT")
 
 class O_ShapeKeysMatchRename(bpy.types.Operator):
     bl_idname = "xbone.shape_keys_match_rename"
     bl_label = "匹配重命名"
-    bl_description = ("基于顶点平均位置匹配重命名活动物体的形态键（需选择2个网格物体）\n"
+    bl_description = ("基于形态键位移指纹（影响区域中心、主位移方向与位移大小）匹配重命名活动物体的形态键（需选择2个网格物体）\n"
                      "用于按参考模型的形态键名称重命名当前模型的形态键")
     
     def execute(self, context: bpy.types.Context) -> Set[str]:
@@ -82,87 +96,52 @@ class O_ShapeKeysMatchRename(bpy.types.Operator):
             
         return obj_a, obj_b
     
-    def _get_shape_key_centers(self, obj: bpy.types.Object) -> Dict[str, np.ndarray]:
-        """获取每个形态键的顶点平均位置"""
-        centers = {}
-        mesh = obj.data
-        shape_keys = mesh.shape_keys.key_blocks
-        
-        # 获取基础网格顶点坐标
-        base_verts = np.zeros(len(mesh.vertices) * 3)
-        mesh.vertices.foreach_get('co', base_verts)
-        base_verts = base_verts.reshape(-1, 3)
-        
-        for sk in shape_keys:
-            if sk == sk.relative_key:  # 跳过基础形态键
-                continue
-                
-            # 获取形态键的相对顶点坐标
-            sk_verts = np.zeros(len(mesh.vertices) * 3)
-            sk.data.foreach_get('co', sk_verts)
-            sk_verts = sk_verts.reshape(-1, 3)
-            
-            # 计算绝对顶点位置
-            abs_verts = base_verts + sk_verts
-            
-            # 转换为全局坐标
-            matrix = np.array(obj.matrix_world)
-            global_verts = np.dot(abs_verts, matrix[:3, :3].T) + matrix[:3, 3]
-            
-            # 计算平均位置
-            centers[sk.name] = np.mean(global_verts, axis=0)
-        
-        return centers
-    
-    def _calculate_similarity(self, pos_a: np.ndarray, pos_b: np.ndarray) -> float:
-        """计算两个位置之间的相似度（基于距离）"""
-        distance = np.linalg.norm(pos_a - pos_b)
-        return 1.0 / (1.0 + distance)
+    def _get_shape_key_fingerprints(self, obj: bpy.types.Object) -> Tuple[List[str], np.ndarray]:
+        """一次提取全部形态键，计算每个形态键相对 relative_key 的位移指纹（世界空间）"""
+        return delta_fingerprints(obj.data, obj.matrix_world)
     
     def _rename_matching_shape_keys(self, 
                                   obj_a: bpy.types.Object, 
                                   obj_b: bpy.types.Object) -> Dict[str, any]:
         """匹配并重命名形态键"""
-        centers_a = self._get_shape_key_centers(obj_a)
-        centers_b = self._get_shape_key_centers(obj_b)
+        names_a, fingerprints_a = self._get_shape_key_fingerprints(obj_a)
+        names_b, fingerprints_b = self._get_shape_key_fingerprints(obj_b)
         
-        if not centers_a:
+        if not names_a:
             raise Exception("A物体没有可用的形态键（只有基础形态键）")
-        if not centers_b:
+        if not names_b:
             raise Exception("B物体没有可用的形态键（只有基础形态键）")
         
-        renamed_count = 0
-        matched_a_keys: Set[str] = set()
-        matches: List[Tuple[str, Optional[str], str]] = []
+        # 向量化计算指纹距离矩阵并求全局最优一对一匹配（超过阈值的配对不参与）
+        assignment = assign_by_features(
+            fingerprints_a,
+            fingerprints_b,
+            max_distance=similarity_to_distance(self.similarity_threshold)
+        )
+        partner = {j: (i, distance) for i, j, distance in assignment}
         
-        shape_keys_b = obj_b.data.shape_keys.key_blocks
+        rename_map: Dict[str, str] = {}
+        matches: List[Tuple[str, Optional[str], str]] = []  # (b_name, a_name, similarity)
         
-        for b_name, b_center in centers_b.items():
-            best_match_name = None
-            best_similarity = 0.0
-            
-            for a_name, a_center in centers_a.items():
-                if a_name in matched_a_keys:
-                    continue
-                    
-                similarity = self._calculate_similarity(a_center, b_center)
-                if similarity > best_similarity and similarity >= self.similarity_threshold:
-                    best_similarity = similarity
-                    best_match_name = a_name
-            
-            if best_match_name:
-                shape_keys_b[b_name].name = best_match_name
-                matched_a_keys.add(best_match_name)
-                renamed_count += 1
-                matches.append((b_name, best_match_name, f"{best_similarity:.3f}"))
+        for j, b_name in enumerate(names_b):
+            if j in partner:
+                i, distance = partner[j]
+                # 相似度 = 1 / (1 + 距离)
+                similarity = 1.0 / (1.0 + distance)
+                rename_map[b_name] = names_a[i]
+                matches.append((b_name, names_a[i], f"{similarity:.3f}"))
             else:
                 matches.append((b_name, None, "no match"))
         
+        # 两阶段重命名，避免互换名称时产生重名
+        apply_renames(obj_b.data.shape_keys.key_blocks, rename_map)
+        renamed_count = len(rename_map)
+        
         return {
             'renamed_count': renamed_count,
             'matches': matches,
-            'total_a': len(centers_a),
-            'total_b': len(centers_b)
+            'total_a': len(names_a),
+            'total_b': len(names_b)
         }
     
     def _print_detailed_results(self, 
@@ -269,8 +248,6 @@ class O_ShapeKeysSortMatch(bpy.types.Operator):
             target_obj.shape_key_add(name="Basis", from_mix=False)
             target_sks = target_obj.data.shape_keys.key_blocks
         
-        # 我们需要知道每个形态键应该移动到的位置
-        desired_order = []
         added_count = 0
         matched_count = 0
         
@@ -279,16 +256,11 @@ class O_ShapeKeysSortMatch(bpy.types.Operator):
         if not basis_sk:
             basis_sk = target_sks[0] if len(target_sks) > 0 else target_obj.shape_key_add(name="Basis", from_mix=False)
         
-        # 确保基础形态键在第一位
-        if basis_sk != target_sks[0]:
-            target_obj.active_shape_key_index = basis_sk.index
-            for _ in range(basis_sk.index):
-                bpy.ops.object.shape_key_move(type='UP')
-        
         # 遍历源物体的形态键顺序
+        desired_order = [basis_sk.name]
         for src_sk in source_sks:
             if src_sk.name == "Basis":
-                continue  # 基础形态键已经在第一位
+                continue  # 基础形态键在第一位
             
             # 检查目标物体是否有该形态键
             if src_sk.name in target_sks:
@@ -304,29 +276,14 @@ class O_ShapeKeysSortMatch(bpy.types.Operator):
         # 添加目标物体独有的形态键到末尾
         kept_count = 0
         for tgt_sk in target_sks:
-            if tgt_sk.name not in desired_order and tgt_sk.name != "Basis":
+            if tgt_sk.name not in desired_order:
                 desired_order.append(tgt_sk.name)
                 kept_count += 1
         
-        # 现在按照desired_order重新排列形态键
-        # 由于Blender没有直接重排API，我们需要通过移动来实现
-        for desired_index, sk_name in enumerate(desired_order):
-            if desired_index == 0:
-                continue  # 基础形态键已经在第一位
-            
-            current_index = target_sks.find(sk_name)
-            if current_index == -1:
-                continue  # 不应该发生
-            
-            # 计算需要移动的次数
-            move_count = current_index - desired_index
-            if move_count <= 0:
-                continue  # 已经在正确位置或更靠前
-            
-            # 移动形态键到正确位置
-            target_obj.active_shape_key_index = current_index
-            for _ in range(move_count):
-                bpy.ops.object.shape_key_move(type='UP')
+        # 一次性重排：移动次数少时用 TOP/BOTTOM 移动，否则快照后按新顺序重建
+        bpy.context.view_layer.objects.active = target_obj
+        reorder = reorder_shape_keys(target_obj, desired_order)
+        print(f"形态键重排方式: {reorder['method']}，操作数: {reorder['operations']}")
         
         return {
             'matched': matched_count,
@@ -434,12 +391,313 @@ class O_ShapeKeysRenameByOrder(bpy.types.Operator):
             'kept': kept_count
         }
 
+class O_ShapeKeysTransfer(bpy.types.Operator):
+    bl_idname = "xbone.shape_keys_transfer"
+    bl_label = "传递形态键"
+    bl_description = ("把选择物体A的形态键传递到活动物体B（拓扑可以不同）\n"
+                      "B的每个顶点投影到A的最近表面，按重心坐标插值A的形态键位移\n"
+                      "对应关系只计算一次，所有形态键一次性插值")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mask_group: bpy.props.StringProperty(
+        name="遮罩顶点组",
+        description="活动物体上的顶点组，位移乘以该组权重；留空则不限制",
+        default=""
+    )
+    max_distance: bpy.props.FloatProperty(
+        name="最大距离",
+        description="到源表面的距离超过该值的顶点不传递位移，0为不限制",
+        default=0.0,
+        min=0.0,
+        precision=4,
+        unit='LENGTH'
+    )
+    overwrite: bpy.props.BoolProperty(
+        name="覆盖同名形态键",
+        description="目标已存在同名形态键时覆盖，否则只传递缺少的形态键",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=260)
+
+    def draw(self, context):
+        layout = self.layout
+        obj = context.active_object
+        if obj and obj.type == 'MESH':
+            layout.prop_search(self, "mask_group", obj, "vertex_groups")
+        layout.prop(self, "max_distance")
+        layout.prop(self, "overwrite")
+
+    def execute(self, context):
+        selected_objs = context.selected_objects
+        target_obj = context.active_object
+        if len(selected_objs) != 2 or target_obj not in selected_objs:
+            self.report({'ERROR'}, "请选择2个网格物体，活动物体为目标")
+            return {'CANCELLED'}
+        source_obj = next(obj for obj in selected_objs if obj != target_obj)
+        if source_obj.type != 'MESH' or target_obj.type != 'MESH':
+            self.report({'ERROR'}, "两个物体都必须是网格类型")
+            return {'CANCELLED'}
+        if not source_obj.data.shape_keys or len(source_obj.data.shape_keys.key_blocks) < 2:
+            self.report({'ERROR'}, "源物体没有可传递的形态键")
+            return {'CANCELLED'}
+        if self.mask_group and self.mask_group not in target_obj.vertex_groups:
+            self.report({'ERROR'}, f"目标物体没有顶点组: {self.mask_group}")
+            return {'CANCELLED'}
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        start_time = time.time()
+        projector = SurfaceProjector(source_obj)
+        written, skipped, max_distance = transfer_shape_keys(
+            projector, source_obj, target_obj,
+            mask=vertex_group_mask(target_obj, self.mask_group),
+            max_distance=self.max_distance,
+            overwrite=self.overwrite)
+
+        print(f"形态键传递 [{source_obj.name} → {target_obj.name}]: 最大表面距离 {max_distance:.4f}")
+        self.report({'INFO'}, f"已传递 {written} 个形态键，跳过 {skipped} 个 "
+                              f"(耗时: {time.time() - start_time:.2f}秒)")
+        return {'FINISHED'}
+
+
+class O_ShapeKeysClean(bpy.types.Operator):
+    bl_idname = "xbone.shape_keys_clean"
+    bl_label = "清理形态键"
+    bl_description = ("清理选择的所有网格物体的形态键\n"
+                      "1. 删除相对 relative_key 的最大位移小于阈值的空形态键\n"
+                      "2. 可选：把小于微小位移阈值的顶点位移清零，使形态键更稀疏")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    threshold: bpy.props.FloatProperty(
+        name="删除阈值",
+        description="最大位移小于该值的形态键被删除",
+        default=0.0001,
+        min=0.0,
+        precision=6,
+        unit='LENGTH'
+    )
+    epsilon: bpy.props.FloatProperty(
+        name="微小位移阈值",
+        description="保留的形态键中位移小于该值的顶点被还原，0为不处理",
+        default=0.0,
+        min=0.0,
+        precision=6,
+        unit='LENGTH'
+    )
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=220)
+
+    def execute(self, context):
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH' and obj.data.shape_keys]
+        if not meshes:
+            self.report({'ERROR'}, "请选择至少一个带形态键的网格物体")
+            return {'CANCELLED'}
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        start_time = time.time()
+        removed_count, zeroed_count, bytes_saved = 0, 0, 0
+        for obj in meshes:
+            result = clean_shape_keys(obj, self.threshold, self.epsilon)
+            removed_count += len(result['removed'])
+            zeroed_count += result['zeroed']
+            bytes_saved += result['bytes_saved']
+            print(f"{obj.name}: 删除{len(result['removed'])}个形态键，"
+                  f"清零{result['zeroed']}个顶点位移（{result['rewritten']}个形态键）")
+            for name in result['removed']:
+                print(f"  - {name}")
+
+        self.report({'INFO'}, f"已处理{len(meshes)}个物体：删除{removed_count}个形态键，清零{zeroed_count}个顶点位移，"
+                              f"释放 {bytes_saved / (1024 * 1024):.2f}MB (耗时: {time.time() - start_time:.2f}秒)")
+        return {'FINISHED'}
+
+
+class O_ShapeKeysSplitLR(bpy.types.Operator):
+    bl_idname = "xbone.shape_keys_split_lr"
+    bl_label = "左右拆分"
+    bl_description = ("按X坐标符号把选择的网格物体的形态键拆分为左右两个形态键（+X为左）\n"
+                      "过渡带内平滑过渡，左右两半相加等于原形态键\n"
+                      "名称已符合左右名称模式的形态键会被跳过")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: bpy.props.EnumProperty(
+        name="范围",
+        items=[
+            ('ALL', '全部', '所有非基础形态键'),
+            ('ACTIVE', '活动', '只拆分活动形态键')
+        ],
+        default='ACTIVE'
+    )
+    band: bpy.props.FloatProperty(
+        name="过渡带宽度",
+        description="对称面两侧平滑过渡的总宽度，0为硬切分",
+        default=0.01,
+        min=0.0,
+        precision=4,
+        unit='LENGTH'
+    )
+    left_suffix: bpy.props.StringProperty(
+        name="左侧后缀",
+        default="_L"
+    )
+    right_suffix: bpy.props.StringProperty(
+        name="右侧后缀",
+        default="_R"
+    )
+    remove_original: bpy.props.BoolProperty(
+        name="删除原形态键",
+        default=False
+    )
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=220)
+
+    def execute(self, context):
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH' and obj.data.shape_keys]
+        if not meshes:
+            self.report({'ERROR'}, "请选择至少一个带形态键的网格物体")
+            return {'CANCELLED'}
+        if not self.left_suffix or self.left_suffix == self.right_suffix:
+            self.report({'ERROR'}, "左右后缀不能为空或相同")
+            return {'CANCELLED'}
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        patterns = parse_mirror_patterns(context.scene.vertex_group_mirror_patterns)
+        patterns.append((self.left_suffix, self.right_suffix))
+
+        start_time = time.time()
+        split_count = 0
+        for obj in meshes:
+            reference = obj.data.shape_keys.reference_key
+            if self.scope == 'ACTIVE':
+                names = [obj.active_shape_key.name] if obj.active_shape_key else []
+            else:
+                names = [kb.name for kb in obj.data.shape_keys.key_blocks]
+            # 已经是单侧的形态键不再拆分
+            names = [name for name in names if name != reference.name
+                     and mirror_name(name, patterns, 'L2R') is None and mirror_name(name, patterns, 'R2L') is None]
+            if not names:
+                continue
+
+            # 左右权重每个网格只计算一次（按坐标缓存），对所有形态键广播
+            left_weights, cache_hit = get_side_weights(obj, self.band)
+            split = split_shape_keys(obj, names, left_weights, self.left_suffix, self.right_suffix, self.remove_original)
+            split_count += len(split)
+            print(f"{obj.name}: 拆分{len(split)}个形态键，左右权重{'命中缓存' if cache_hit else '已重建'}")
+            for name, left, right in split:
+                print(f"  {name} → {left}, {right}")
+
+        if not split_count:
+            self.report({'WARNING'}, "没有需要拆分的形态键")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"已拆分{split_count}个形态键 (耗时: {time.time() - start_time:.2f}秒)")
+        return {'FINISHED'}
+
+
+class O_ShapeKeysExportDeltas(bpy.types.Operator, ExportHelper):
+    bl_idname = "xbone.shape_keys_export_deltas"
+    bl_label = "导出位移"
+    bl_description = ("把活动网格的形态键以稀疏位移形式导出为NPZ文件\n"
+                      "只保存相对基础形态键位移超过阈值的顶点，文件远小于完整坐标")
+    filename_ext = ".npz"
+    filter_glob: bpy.props.StringProperty(
+        default="*.npz",
+        options={'HIDDEN'},
+    )
+
+    precision: bpy.props.EnumProperty(
+        name="精度",
+        description="位移的存储精度",
+        items=[
+            ('FLOAT16', "半精度", "16位浮点，文件更小，误差约为位移的千分之一"),
+            ('FLOAT32', "单精度", "32位浮点，无损保存位移"),
+        ],
+        default='FLOAT16',
+    )
+    epsilon: bpy.props.FloatProperty(
+        name="位移阈值",
+        description="位移长度不超过此值的顶点视为未移动，不写入文件",
+        default=1e-5,
+        min=0.0,
+        precision=6,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.data.shape_keys is not None
+
+    def execute(self, context):
+        start_time = time.time()
+        try:
+            num_keys, nnz = export_shape_key_deltas(context.active_object.data, self.filepath,
+                                                    self.precision, self.epsilon)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        size_kb = os.path.getsize(self.filepath) / 1024
+        self.report({'INFO'}, f"已导出 {num_keys} 个形态键，{nnz} 个顶点位移，"
+                              f"文件 {size_kb:.1f}KB (耗时: {time.time() - start_time:.2f}秒)")
+        return {'FINISHED'}
+
+
+class O_ShapeKeysImportDeltas(bpy.types.Operator, ImportHelper):
+    bl_idname = "xbone.shape_keys_import_deltas"
+    bl_label = "导入位移"
+    bl_description = ("从稀疏位移NPZ文件导入形态键到活动网格\n"
+                      "网格顶点数量必须与导出时一致，位移叠加在当前基础形态键上")
+    filename_ext = ".npz"
+    filter_glob: bpy.props.StringProperty(
+        default="*.npz",
+        options={'HIDDEN'},
+    )
+
+    overwrite: bpy.props.BoolProperty(
+        name="覆盖同名形态键",
+        description="已存在同名形态键时覆盖其坐标，否则跳过",
+        default=True,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.mode != 'EDIT'
+
+    def execute(self, context):
+        if not self.filepath or not os.path.exists(self.filepath):
+            self.report({'ERROR'}, "请选择有效的NPZ文件")
+            return {'CANCELLED'}
+
+        start_time = time.time()
+        try:
+            written, skipped = import_shape_key_deltas(context.active_object, self.filepath, self.overwrite)
+        except (OSError, KeyError, ValueError) as e:
+            self.report({'ERROR'}, f"导入失败: {e}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"已导入 {written} 个形态键，跳过 {skipped} 个 "
+                              f"(耗时: {time.time() - start_time:.2f}秒)")
+        return {'FINISHED'}
+
 
 def register():
     bpy.utils.register_class(DATA_PT_shape_key_tools)
     bpy.utils.register_class(O_ShapeKeysMatchRename)
     bpy.utils.register_class(O_ShapeKeysSortMatch)
     bpy.utils.register_class(O_ShapeKeysRenameByOrder)
+    bpy.utils.register_class(O_ShapeKeysTransfer)
+    bpy.utils.register_class(O_ShapeKeysClean)
+    bpy.utils.register_class(O_ShapeKeysSplitLR)
+    bpy.utils.register_class(O_ShapeKeysExportDeltas)
+    bpy.utils.register_class(O_ShapeKeysImportDeltas)
 
     bpy.types.Scene.shape_key_similarity_threshold = bpy.props.FloatProperty(
         name="形态键相似度阈值",
@@ -456,5 +714,10 @@ def unregister():
     bpy.utils.unregister_class(O_ShapeKeysMatchRename)
     bpy.utils.unregister_class(O_ShapeKeysSortMatch)
     bpy.utils.unregister_class(O_ShapeKeysRenameByOrder)
+    bpy.utils.unregister_class(O_ShapeKeysTransfer)
+    bpy.utils.unregister_class(O_ShapeKeysClean)
+    bpy.utils.unregister_class(O_ShapeKeysSplitLR)
+    bpy.utils.unregister_class(O_ShapeKeysExportDeltas)
+    bpy.utils.unregister_class(O_ShapeKeysImportDeltas)
 
     del bpy.types.Scene.shape_key_similarity_threshold
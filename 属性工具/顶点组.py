@@ -2,7 +2,14 @@
 import bpy
 import numpy as np
 import time
+from concurrent.futures import ThreadPoolExecutor
+from bpy.app.handlers import persistent
 from typing import Dict, Tuple, Set, List, Optional
+from ..通用工具.匹配算法 import assign_by_distance, assign_by_descriptors, similarity_to_distance, apply_renames
+from ..通用工具.权重矩阵 import (get_weight_matrix, peek_weight_matrix, get_group_descriptors, rebuild_vertex_groups,
+                               note_vertex_group_renames)
+from ..通用工具.镜像 import (DEFAULT_MIRROR_PATTERNS, get_symmetry_map, clear_symmetry_cache,
+                            parse_mirror_patterns, resolve_mirror_pairs, mirror_vertex_groups)
 
 class DATA_PT_vertex_group_tools(bpy.types.Panel):
     bl_label = "顶点组"
@@ -25,8 +32,11 @@ class DATA_PT_vertex_group_tools(bpy.types.Panel):
             return
         count0 = len(obj.vertex_groups)
         
+        # 实时统计只读取缓存，计时器只复用已缓存的权重矩阵，完整提取由"统计"按钮触发
+        live_stats = get_live_stats(obj) if context.scene.vertex_group_live_stats else None
+        
         # 获取存储的统计信息，如果没有则显示默认值
-        stats = obj.get("vertex_group_stats", {
+        stats = live_stats or obj.get("vertex_group_stats", {
             "total": count0,
             "with_weight": "N/A",
             "zero_weight": "N/A"
@@ -37,16 +47,41 @@ class DATA_PT_vertex_group_tools(bpy.types.Panel):
         row.label(text=f"数量: {stats['total']}")
         row.label(text=f"有权重: {stats['with_weight']}")
         row.label(text=f"无权重: {stats['zero_weight']}")
+        row.prop(context.scene, "vertex_group_live_stats", text="", icon="TIME")
+        
+        # 活动顶点组的顶点数量与权重总和
+        active_vg = obj.vertex_groups.active
+        if live_stats and active_vg and active_vg.index < len(live_stats['counts']):
+            row = col.row(align=True)
+            row.label(text=f"{active_vg.name}", icon="GROUP_VERTEX")
+            row.label(text=f"顶点: {live_stats['counts'][active_vg.index]}")
+            row.label(text=f"权重和: {live_stats['sums'][active_vg.index]:.2f}")
+        if context.scene.vertex_group_live_stats and obj.mode == 'EDIT':
+            col.label(text="编辑模式下暂停实时统计", icon="PAUSE")
+        elif context.scene.vertex_group_live_stats and live_stats is None:
+            col.label(text="暂无统计，点击统计按钮刷新", icon="INFO")
+        elif live_stats and live_stats['stale']:
+            col.label(text="权重已修改，统计可能过期", icon="TIME")
 
         row = col.row(align=True)
         row.operator(O_VertexGroupsCount.bl_idname, text=O_VertexGroupsCount.bl_label, icon="GROUP_VERTEX")
         row.operator(O_VertexGroupsDelNoneActive.bl_idname, text=O_VertexGroupsDelNoneActive.bl_label, icon="GROUP_VERTEX")
 
         row = col.row(align=True)
-        row.prop(context.scene, "similarity_threshold")
+        if context.scene.vertex_group_match_metric == 'DESCRIPTOR':
+            row.prop(context.scene, "vertex_group_descriptor_threshold")
+        else:
+            row.prop(context.scene, "similarity_threshold")
+        row.prop(context.scene, "vertex_group_weighted_center", text="", icon="MOD_VERTEX_WEIGHT")
+        row.prop(context.scene, "vertex_group_match_metric", text="")
         row.operator(O_VertexGroupsMatchRename.bl_idname, text=O_VertexGroupsMatchRename.bl_label, icon="SORTBYEXT")
         row.separator()  # 添加分割线
         row.operator(O_VertexGroupsSortMatch.bl_idname, text=O_VertexGroupsSortMatch.bl_label, icon="SORTSIZE")
+        row.prop(context.scene, "vertex_group_batch_mode", text="", icon="DUPLICATE")
+
+        row = col.row(align=True)
+        row.prop(context.scene, "vertex_group_mirror_patterns", text="")
+        row.operator(O_VertexGroupsMirror.bl_idname, text=O_VertexGroupsMirror.bl_label, icon="MOD_MIRROR")
 
 
 class O_VertexGroupsCount(bpy.types.Operator):
@@ -58,27 +93,14 @@ class O_VertexGroupsCount(bpy.types.Operator):
         obj = context.active_object
         if obj and obj.type == 'MESH':
             vertex_groups = obj.vertex_groups
-            mesh = obj.data
-            
-            # 使用更高效的方法检查顶点组是否有权重
-            count_with_weight = 0
-            count_zero_weight = 0
             
-            # 为每个顶点组创建一个标记，初始为False(无权重)
-            has_weights = [False] * len(vertex_groups)
-            
-            # 遍历所有顶点
-            for vertex in mesh.vertices:
-                for group in vertex.groups:
-                    group_index = group.group
-                    # 如果找到至少一个顶点有该组的权重，标记为True
-                    if group.weight > 0:
-                        has_weights[group_index] = True
+            # 一次构建稀疏权重矩阵，按顶点组归约是否有权重
+            weight_matrix = get_weight_matrix(obj)
+            has_weights = weight_matrix.group_has_weight()
+            store_live_stats(obj, weight_matrix)
             
             # 统计结果
-            for has_weight in has_weights:
-                if has_weight:
-                    count_with_weight += 1
+            count_with_weight = int(np.count_nonzero(has_weights))
             count_zero_weight = len(vertex_groups) - count_with_weight
             
             # 将结果存储在对象属性中
@@ -105,17 +127,11 @@ class O_VertexGroupsDelNoneActive(bpy.types.Operator):
         obj = context.active_object
         if obj and obj.type == 'MESH':
             vertex_groups = obj.vertex_groups
-            mesh = obj.data
-            
-            # 使用更高效的方法检查顶点组是否有权重
-            has_weights = [False] * len(vertex_groups)
             
-            # 遍历所有顶点
-            for vertex in mesh.vertices:
-                for group in vertex.groups:
-                    group_index = group.group
-                    if group.weight > 0:
-                        has_weights[group_index] = True
+            # 一次构建稀疏权重矩阵，按顶点组归约是否有权重
+            weight_matrix = get_weight_matrix(obj)
+            has_weights = weight_matrix.group_has_weight()
+            store_live_stats(obj, weight_matrix)
             
             # 收集要删除的顶点组名称（逆序以便安全删除）
             groups_to_remove = []
@@ -143,18 +159,130 @@ class O_VertexGroupsDelNoneActive(bpy.types.Operator):
 
         return {'FINISHED'}
 
+class O_VertexGroupsMirror(bpy.types.Operator):
+    bl_idname = "xbone.vertex_groups_mirror"
+    bl_label = "镜像权重"
+    bl_description = "按名称模式把一侧顶点组的权重沿X轴镜像到对侧顶点组（对称映射按顶点坐标缓存）"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    direction: bpy.props.EnumProperty(
+        name="方向",
+        items=[
+            ('L2R', '左 → 右', '把模式左侧名称的顶点组镜像到右侧'),
+            ('R2L', '右 → 左', '把模式右侧名称的顶点组镜像到左侧')
+        ],
+        default='L2R'
+    )
+    scope: bpy.props.EnumProperty(
+        name="范围",
+        items=[
+            ('ALL', '全部', '所有匹配名称模式的顶点组'),
+            ('ACTIVE', '活动', '只镜像活动顶点组')
+        ],
+        default='ALL'
+    )
+    tolerance: bpy.props.FloatProperty(
+        name="容差",
+        description="查找对称顶点时允许的最大距离",
+        default=0.001,
+        min=0.0,
+        precision=4
+    )
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=200)
+
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'MESH':
+            self.report({'ERROR'}, "请先选择一个Mesh对象作为活动对象。")
+            return {'CANCELLED'}
+        if obj.mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        patterns = parse_mirror_patterns(context.scene.vertex_group_mirror_patterns)
+        if self.scope == 'ACTIVE':
+            names = [obj.vertex_groups.active.name] if obj.vertex_groups.active else []
+        else:
+            names = [vg.name for vg in obj.vertex_groups]
+        pairs = resolve_mirror_pairs(names, patterns, self.direction)
+        if not pairs:
+            self.report({'WARNING'}, "没有符合名称模式的顶点组")
+            return {'CANCELLED'}
+
+        start_time = time.time()
+        mirror, cache_hit = get_symmetry_map(obj, self.tolerance)
+        unmatched = int(np.count_nonzero(mirror < 0))
+        written = mirror_vertex_groups(obj, pairs, mirror)
+
+        for source, target in pairs.items():
+            print(f"{source} → {target}: {written.get(target, 0)}个顶点")
+        print(f"对称映射{'命中缓存' if cache_hit else '已重建'}，{unmatched}个顶点没有对称顶点，耗时 {time.time() - start_time:.3f}秒")
+
+        if unmatched:
+            self.report({'WARNING'}, f"已镜像{len(written)}个顶点组，{unmatched}个顶点在容差内没有对称顶点")
+        else:
+            self.report({'INFO'}, f"已镜像{len(written)}个顶点组")
+        return {'FINISHED'}
+
+
+def match_group_descriptors(names_a: List[str],
+                            desc_a: Dict[str, np.ndarray],
+                            names_b: List[str],
+                            desc_b: Dict[str, np.ndarray],
+                            similarity_threshold: float,
+                            match_metric: str) -> Tuple[Dict[str, str], List[Tuple[str, Optional[str], str]]]:
+    """求全局最优匹配，返回 (重命名映射, 匹配明细)
+
+    只做数组运算且不访问 bpy 数据，可在后台线程执行
+    """
+    # 构建完整距离矩阵并求全局最优一对一匹配（超过阈值的配对不参与）
+    max_distance = similarity_to_distance(similarity_threshold)
+    if match_metric == 'DESCRIPTOR':
+        assignment = assign_by_descriptors(desc_a, desc_b, max_cost=max_distance)
+    else:
+        assignment = assign_by_distance(desc_a['centroid'], desc_b['centroid'], max_distance=max_distance)
+    partner = {j: (i, distance) for i, j, distance in assignment}
+    
+    rename_map: Dict[str, str] = {}
+    matches: List[Tuple[str, Optional[str], str]] = []  # (b_name, a_name, similarity)
+    
+    for j, b_name in enumerate(names_b):
+        if j in partner:
+            i, distance = partner[j]
+            # 相似度 = 1 / (1 + 距离)
+            similarity = 1.0 / (1.0 + distance)
+            rename_map[b_name] = names_a[i]
+            matches.append((b_name, names_a[i], f"{similarity:.3f}"))
+        else:
+            matches.append((b_name, None, "no match"))
+    
+    return rename_map, matches
+
+
 class O_VertexGroupsMatchRename(bpy.types.Operator):
     bl_idname = "xbone.vertex_groups_match_rename"
     bl_label = "匹配重命名"
-    bl_description = ("基于顶点平均位置匹配重命名活动物体的顶点组（需选择2个网格物体）\n"
+    bl_description = ("基于顶点组空间分布匹配重命名活动物体的顶点组（需选择2个网格物体）\n"
+                     "批量模式下活动物体作为参考，其余所有选中网格物体都按参考重命名\n"
                      "我用来给鸣潮提取的模型按解包的模型骨骼重命名，这样顶点组有名称意义也可以操控")
     
     def execute(self, context: bpy.types.Context) -> Set[str]:
-        self.similarity_threshold = context.scene.similarity_threshold
         """主执行函数"""
+        self.use_weighted_center = context.scene.vertex_group_weighted_center
+        self.match_metric = context.scene.vertex_group_match_metric
+        # 组合距离的量级大于中心距离，两种度量各自使用独立的阈值
+        if self.match_metric == 'DESCRIPTOR':
+            self.similarity_threshold = context.scene.vertex_group_descriptor_threshold
+        else:
+            self.similarity_threshold = context.scene.similarity_threshold
         start_time = time.time()  # 记录开始时间
         
         try:
+            if context.scene.vertex_group_batch_mode:
+                return self._execute_batch(context, start_time)
+
             # 验证输入并获取目标物体
             obj_a, obj_b = self._validate_input(context)
             
@@ -181,6 +309,63 @@ class O_VertexGroupsMatchRename(bpy.types.Operator):
             self.report({'ERROR'}, f"{str(e)} (耗时: {elapsed_time:.2f}秒)")
             return {'CANCELLED'}
     
+    def _execute_batch(self, context: bpy.types.Context, start_time: float) -> Set[str]:
+        """批量模式：活动物体为参考，其余选中网格物体依次匹配重命名"""
+        obj_a, targets = self._validate_batch_input(context)
+        
+        # 参考物体的描述符只计算一次
+        names_a, desc_a = self._get_vertex_group_descriptors(obj_a)
+        if not names_a:
+            raise Exception("参考物体没有非空顶点组")
+        
+        # 流水线：主线程提取下一个目标的数组时，后台线程求解上一个目标的匹配
+        reports = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = None
+            for obj_b in targets + [None]:
+                submitted = None
+                empty_report = None
+                if obj_b is not None:
+                    extract_start = time.time()
+                    names_b, desc_b = self._get_vertex_group_descriptors(obj_b)
+                    extract_time = time.time() - extract_start
+                    if names_b:
+                        submitted = (obj_b, names_b, extract_time,
+                                     executor.submit(match_group_descriptors, names_a, desc_a, names_b, desc_b,
+                                                     self.similarity_threshold, self.match_metric))
+                    else:
+                        empty_report = (obj_b, None, extract_time, 0.0)
+                
+                if pending is not None:
+                    reports.append(self._finish_batch_target(names_a, *pending))
+                if empty_report is not None:
+                    reports.append(empty_report)
+                pending = submitted
+        
+        for obj_b, result, _, _ in reports:
+            if result is not None:
+                self._print_detailed_results(obj_a, obj_b, result)
+        self._print_batch_summary(obj_a, reports)
+        
+        elapsed_time = time.time() - start_time
+        renamed_total = sum(result['renamed_count'] for _, result, _, _ in reports if result)
+        self.report({'INFO'}, f"批量匹配完成: {len(targets)} 个物体, 共重命名 {renamed_total} 个顶点组 (总耗时: {elapsed_time:.2f}秒)")
+        return {'FINISHED'}
+    
+    def _finish_batch_target(self, names_a, obj_b, names_b, extract_time, future):
+        """等待后台匹配完成并在主线程执行重命名"""
+        match_start = time.time()
+        rename_map, matches = future.result()
+        apply_renames(obj_b.vertex_groups, rename_map)
+        note_vertex_group_renames(obj_b)
+        result = {
+            'renamed_count': len(rename_map),
+            'matches': matches,
+            'total_a': len(names_a),
+            'total_b': len(names_b)
+        }
+        return obj_b, result, extract_time, time.time() - match_start
+    
     def _validate_input(self, context: bpy.types.Context) -> Tuple[bpy.types.Object, bpy.types.Object]:
         """验证输入并返回两个网格物体"""
         selected_objs = context.selected_objects
@@ -205,9 +390,21 @@ class O_VertexGroupsMatchRename(bpy.types.Operator):
             
         return obj_a, obj_b
     
-    def _get_vertex_group_centers(self, obj: bpy.types.Object) -> Dict[str, np.ndarray]:
-        """获取每个顶点组的中心位置（平均位置）"""
-        centers = {}
+    def _validate_batch_input(self, context: bpy.types.Context) -> Tuple[bpy.types.Object, List[bpy.types.Object]]:
+        """验证批量模式输入，返回参考物体（活动物体）和所有目标网格物体"""
+        active_obj = context.active_object
+        
+        if active_obj is None or active_obj.type != 'MESH':
+            raise ValueError("活动物体必须是作为参考的网格物体")
+        
+        targets = [obj for obj in context.selected_objects if obj != active_obj and obj.type == 'MESH']
+        if not targets:
+            raise ValueError("请至少再选择1个目标网格物体")
+        
+        return active_obj, targets
+    
+    def _get_vertex_group_descriptors(self, obj: bpy.types.Object) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """一次向量化计算所有非空顶点组的空间描述符（中心、协方差、包围盒、数量、权重总和）"""
         mesh = obj.data
         global_verts = np.zeros((len(mesh.vertices), 3))
         
@@ -218,75 +415,42 @@ class O_VertexGroupsMatchRename(bpy.types.Operator):
         matrix = np.array(obj.matrix_world)
         global_verts = np.dot(global_verts, matrix[:3, :3].T) + matrix[:3, 3]
         
-        for vg in obj.vertex_groups:
-            vertex_indices = []
-            
-            # 获取顶点组中的所有顶点索引
-            for vid in range(len(mesh.vertices)):
-                try:
-                    if vg.weight(vid) > 0:
-                        vertex_indices.append(vid)
-                except RuntimeError:
-                    pass
-            
-            if vertex_indices:
-                # 计算这些顶点的平均位置
-                centers[vg.name] = np.mean(global_verts[vertex_indices], axis=0)
+        # 基于稀疏权重矩阵一次散射累加出所有顶点组的描述符（网格内容未变化时读取物体上的缓存）
+        descriptors, cache_hit = get_group_descriptors(obj, global_verts, weighted=self.use_weighted_center)
+        if cache_hit:
+            print(f"{obj.name}: 使用缓存的顶点组描述符")
         
-        return centers
-    
-    def _calculate_similarity(self, pos_a: np.ndarray, pos_b: np.ndarray) -> float:
-        """计算两个位置之间的相似度（基于距离）"""
-        distance = np.linalg.norm(pos_a - pos_b)
-        # 将距离转换为相似度（距离越小，相似度越高）
-        # 使用简单的转换：相似度 = 1 / (1 + 距离)
-        return 1.0 / (1.0 + distance)
+        # 只保留非空顶点组
+        valid = descriptors.pop('valid').astype(bool)
+        names = [vg.name for i, vg in enumerate(obj.vertex_groups) if valid[i]]
+        return names, {key: value[valid] for key, value in descriptors.items()}
     
     def _rename_matching_vertex_groups(self, 
                                      obj_a: bpy.types.Object, 
                                      obj_b: bpy.types.Object) -> Dict[str, any]:
         """匹配并重命名顶点组"""
-        centers_a = self._get_vertex_group_centers(obj_a)
-        centers_b = self._get_vertex_group_centers(obj_b)
+        names_a, desc_a = self._get_vertex_group_descriptors(obj_a)
+        names_b, desc_b = self._get_vertex_group_descriptors(obj_b)
         
         # 检查非空顶点组
-        if not centers_a:
+        if not names_a:
             raise Exception("A物体没有非空顶点组")
-        if not centers_b:
+        if not names_b:
             raise Exception("B物体没有非空顶点组")
         
-        renamed_count = 0
-        matched_a_groups: Set[str] = set()
-        matches: List[Tuple[str, Optional[str], str]] = []  # (b_name, a_name, similarity)
+        rename_map, matches = match_group_descriptors(names_a, desc_a, names_b, desc_b,
+                                                      self.similarity_threshold, self.match_metric)
         
-        for b_name, b_center in centers_b.items():
-            best_match_name = None
-            best_similarity = 0.0
-            
-            # 寻找最佳匹配
-            for a_name, a_center in centers_a.items():
-                if a_name in matched_a_groups:
-                    continue
-                    
-                similarity = self._calculate_similarity(a_center, b_center)
-                if similarity > best_similarity and similarity >= self.similarity_threshold:
-                    best_similarity = similarity
-                    best_match_name = a_name
-            
-            # 执行重命名
-            if best_match_name:
-                obj_b.vertex_groups[b_name].name = best_match_name
-                matched_a_groups.add(best_match_name)
-                renamed_count += 1
-                matches.append((b_name, best_match_name, f"{best_similarity:.3f}"))
-            else:
-                matches.append((b_name, None, "no match"))
+        # 两阶段重命名，避免互换名称时产生重名
+        apply_renames(obj_b.vertex_groups, rename_map)
+        note_vertex_group_renames(obj_b)
+        renamed_count = len(rename_map)
         
         return {
             'renamed_count': renamed_count,
             'matches': matches,
-            'total_a': len(centers_a),
-            'total_b': len(centers_b)
+            'total_a': len(names_a),
+            'total_b': len(names_b)
         }
     
     def _print_detailed_results(self, 
@@ -301,6 +465,8 @@ class O_VertexGroupsMatchRename(bpy.types.Operator):
         print(header)
         print(separator)
         print(f"相似度阈值: {self.similarity_threshold:.3f}")
+        print(f"中心计算: {'权重加权' if self.use_weighted_center else '算术平均'}")
+        print(f"匹配度量: {'组合描述符' if self.match_metric == 'DESCRIPTOR' else '中心距离'}")
         print(f"{'B物体原始名称':<30} {'重命名为':<30} {'相似度':<20}")
         print("-" * 80)
         
@@ -323,6 +489,24 @@ class O_VertexGroupsMatchRename(bpy.types.Operator):
         print(f"  未匹配数量: {unmatched}")
         print(f"  总重命名数量: {result['renamed_count']}")
         print(separator)
+    
+    def _print_batch_summary(self, obj_a: bpy.types.Object, reports: list) -> None:
+        """打印批量模式的汇总报告"""
+        header = f"顶点组批量匹配汇总 (参考物体: {obj_a.name}, 目标数量: {len(reports)})"
+        separator = "=" * len(header)
+        
+        print(f"\n{separator}")
+        print(header)
+        print(separator)
+        print(f"{'目标物体':<30} {'重命名/非空组':<16} {'提取耗时':<10} {'匹配耗时':<10}")
+        print("-" * 80)
+        for obj_b, result, extract_time, match_time in reports:
+            if result is None:
+                print(f"{obj_b.name:<30} {'无非空顶点组':<16} {extract_time:<10.3f} {'-':<10}")
+            else:
+                ratio = f"{result['renamed_count']}/{result['total_b']}"
+                print(f"{obj_b.name:<30} {ratio:<16} {extract_time:<10.3f} {match_time:<10.3f}")
+        print(separator)
 
 
 class O_VertexGroupsSortMatch(bpy.types.Operator):
@@ -333,10 +517,14 @@ class O_VertexGroupsSortMatch(bpy.types.Operator):
                      "1. 按选择物体的顶点组顺序依次处理\n"
                      "2. 缺少的顶点组会新建空组\n"
                      "3. 已有的顶点组会移动到对应位置\n"
-                     "4. 多余的顶点组会自动保留在最后")
+                     "4. 多余的顶点组会自动保留在最后\n"
+                     "批量模式下活动物体作为参考，其余所有选中网格物体都按参考排序")
 
     def execute(self, context):
         try:
+            if context.scene.vertex_group_batch_mode:
+                return self._execute_batch(context)
+
             selected_objs = context.selected_objects
             active_obj = context.active_object
             
@@ -375,49 +563,37 @@ class O_VertexGroupsSortMatch(bpy.types.Operator):
             self.report({'ERROR'}, str(e))
             return {'CANCELLED'}
     
-    def _sort_vertex_groups(self, context, source_obj, target_obj):
-        source_vgs = source_obj.vertex_groups
-        target_vgs = target_obj.vertex_groups
+    def _execute_batch(self, context):
+        """批量模式：活动物体为参考，其余选中网格物体都按其顶点组顺序排列"""
+        source_obj = context.active_object
+        if source_obj is None or source_obj.type != 'MESH':
+            self.report({'ERROR'}, "活动物体必须是作为参考的网格物体")
+            return {'CANCELLED'}
         
-        added_count = 0
-        matched_count = 0
+        targets = [obj for obj in context.selected_objects if obj != source_obj and obj.type == 'MESH']
+        if not targets:
+            self.report({'ERROR'}, "请至少再选择1个目标网格物体")
+            return {'CANCELLED'}
         
-        # 保存当前活动顶点组索引
-        original_active_index = target_obj.vertex_groups.active_index
+        start_time = time.time()
+        print(f"\n顶点组批量排序结果 [参考: {source_obj.name}]:")
+        for target_obj in targets:
+            result = self._sort_vertex_groups(context, source_obj, target_obj)
+            print(f"  {target_obj.name:<30} 匹配 {result['matched']}个, 新建 {result['added']}个")
         
-        # 遍历源物体顶点组顺序
-        for desired_index, src_vg in enumerate(source_vgs):
-            if src_vg.name in target_vgs:
-                # 已有顶点组，移动到正确位置
-                current_index = target_vgs.find(src_vg.name)
-                
-                # 设置活动顶点组
-                target_obj.vertex_groups.active_index = current_index
-                
-                # 计算需要移动的次数
-                move_count = current_index - desired_index
-                
-                # 向上移动
-                for _ in range(move_count):
-                    bpy.ops.object.vertex_group_move(direction='UP')
-                
-                matched_count += 1
-            else:
-                # 新建顶点组
-                new_vg = target_vgs.new(name=src_vg.name)
-                added_count += 1
-                
-                # 设置活动顶点组为新创建的组
-                target_obj.vertex_groups.active_index = len(target_vgs) - 1
-                
-                # 移动到正确位置
-                move_count = len(target_vgs) - 1 - desired_index
-                for _ in range(move_count):
-                    bpy.ops.object.vertex_group_move(direction='UP')
+        elapsed_time = time.time() - start_time
+        self.report({'INFO'}, f"批量排序完成: {len(targets)} 个物体 (总耗时: {elapsed_time:.2f}秒)")
+        return {'FINISHED'}
+    
+    def _sort_vertex_groups(self, context, source_obj, target_obj):
+        source_names = [vg.name for vg in source_obj.vertex_groups]
+        target_names = {vg.name for vg in target_obj.vertex_groups}
+        
+        matched_count = sum(1 for name in source_names if name in target_names)
+        added_count = len(source_names) - matched_count
         
-        # 恢复原始活动顶点组
-        if original_active_index < len(target_vgs):
-            target_obj.vertex_groups.active_index = original_active_index
+        # 一次计算目标顺序，按顺序重建顶点组并写回权重（多余的顶点组保留在最后）
+        rebuild_vertex_groups(target_obj, source_names)
         
         return {
             'matched': matched_count,
@@ -425,12 +601,114 @@ class O_VertexGroupsSortMatch(bpy.types.Operator):
         }
 
 
+########################## Divider ##########################
+
+# 实时统计的最小刷新间隔（秒）
+LIVE_STATS_INTERVAL = 0.5
+
+# 网格指针 → 统计结果
+_live_stats: Dict[int, dict] = {}
+_live_stats_timer_pending = False
+
+
+def get_live_stats(obj: bpy.types.Object) -> Optional[dict]:
+    """读取活动网格的实时统计缓存，过期时安排一次刷新并先返回旧结果（编辑模式下不刷新）
+
+    顶点组数量变化后旧结果无法对应，返回None
+    """
+    if obj.mode == 'EDIT':
+        return None
+    stats = _live_stats.get(obj.data.as_pointer())
+    # 只有已缓存的权重矩阵可用时才安排刷新，避免缓存失效期间反复轮询
+    if (stats is None or stats['stale']) and peek_weight_matrix(obj) is not None:
+        _schedule_live_stats()
+    if stats is None or stats['total'] != len(obj.vertex_groups):
+        return None
+    return stats
+
+
+def store_live_stats(obj: bpy.types.Object, weight_matrix) -> None:
+    """由权重矩阵向量化计算顶点组统计并写入缓存"""
+    counts = weight_matrix.group_vertex_counts()
+    with_weight = int(np.count_nonzero(counts))
+    _live_stats[obj.data.as_pointer()] = {
+        'stale': False,
+        'total': weight_matrix.num_groups,
+        'with_weight': with_weight,
+        'zero_weight': weight_matrix.num_groups - with_weight,
+        'counts': counts.tolist(),
+        'sums': weight_matrix.group_weight_sums().tolist(),
+    }
+
+
+def _schedule_live_stats() -> None:
+    """节流：间隔时间内的多次更新只触发一次计算"""
+    global _live_stats_timer_pending
+    if not _live_stats_timer_pending:
+        _live_stats_timer_pending = True
+        bpy.app.timers.register(_live_stats_timer, first_interval=LIVE_STATS_INTERVAL)
+
+
+def _live_stats_timer():
+    """计时器回调：由已缓存的权重矩阵计算统计并刷新面板
+
+    不在计时器中提取权重（大网格上需要数秒，会在每次绘制权重后卡住视图）；
+    缓存失效时保留旧结果，直到其他操作重建了权重矩阵或用户点击统计按钮
+    """
+    global _live_stats_timer_pending
+    _live_stats_timer_pending = False
+
+    context = bpy.context
+    scene = context.scene
+    if scene is None or not getattr(scene, 'vertex_group_live_stats', False):
+        return None
+    obj = context.view_layer.objects.active
+    # 编辑模式下网格数据不同步，跳过
+    if obj is None or obj.type != 'MESH' or obj.mode == 'EDIT':
+        return None
+
+    weight_matrix = peek_weight_matrix(obj)
+    if weight_matrix is None:
+        return None
+    store_live_stats(obj, weight_matrix)
+
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return None
+
+
+@persistent
+def _on_live_stats_depsgraph_update(scene, depsgraph):
+    """只在活动网格的数据实际变化时安排刷新"""
+    if not getattr(scene, 'vertex_group_live_stats', False):
+        return
+    obj = depsgraph.view_layer.objects.active
+    if obj is None or obj.type != 'MESH':
+        return
+    for update in depsgraph.updates:
+        if update.is_updated_geometry and update.id.original in (obj, obj.data):
+            stats = _live_stats.get(obj.data.as_pointer())
+            if stats is not None:
+                stats['stale'] = True
+            _schedule_live_stats()
+            return
+
+
+def _on_live_stats_toggle(self, context):
+    _live_stats.clear()
+    if self.vertex_group_live_stats:
+        _schedule_live_stats()
+
+
 def register():
     bpy.utils.register_class(DATA_PT_vertex_group_tools)
     bpy.utils.register_class(O_VertexGroupsCount)
     bpy.utils.register_class(O_VertexGroupsDelNoneActive)
     bpy.utils.register_class(O_VertexGroupsMatchRename)
     bpy.utils.register_class(O_VertexGroupsSortMatch)
+    bpy.utils.register_class(O_VertexGroupsMirror)
 
     bpy.types.Scene.similarity_threshold = bpy.props.FloatProperty(
         name="顶点组相似度阈值",
@@ -441,12 +719,68 @@ def register():
         step=0.01,
         precision=3
     )
+    bpy.types.Scene.vertex_group_descriptor_threshold = bpy.props.FloatProperty(
+        name="组合度量相似度阈值",
+        description=("使用组合描述符匹配时的最小相似度(0-1)。组合距离在中心距离上叠加包围盒、协方差与权重总和差异，"
+                     "对同形状的组约为中心距离的1.5倍，默认0.90约相当于中心距离模式的0.94"),
+        default=0.9,
+        min=0.5,
+        max=1.0,
+        step=0.01,
+        precision=3
+    )
+    bpy.types.Scene.vertex_group_weighted_center = bpy.props.BoolProperty(
+        name="权重加权中心",
+        description="匹配时使用权重加权的顶点组中心，关闭则使用有权重顶点的平均位置",
+        default=True
+    )
+    bpy.types.Scene.vertex_group_match_metric = bpy.props.EnumProperty(
+        name="匹配度量",
+        description="匹配顶点组时使用的距离度量",
+        items=[
+            ('DESCRIPTOR', '组合描述符', '中心、协方差主轴、包围盒与权重总和的组合距离，可区分中心重合的对称组'),
+            ('CENTROID', '中心距离', '仅使用顶点组中心的距离')
+        ],
+        default='DESCRIPTOR'
+    )
+    bpy.types.Scene.vertex_group_batch_mode = bpy.props.BoolProperty(
+        name="批量模式",
+        description="活动物体作为参考，其余所有选中的网格物体作为目标（匹配重命名与名称排序）",
+        default=False
+    )
+    bpy.types.Scene.vertex_group_live_stats = bpy.props.BoolProperty(
+        name="实时统计",
+        description="自动统计活动网格的顶点组（数据变化后节流刷新），显示活动顶点组的顶点数量与权重总和",
+        default=False,
+        update=_on_live_stats_toggle
+    )
+    bpy.types.Scene.vertex_group_mirror_patterns = bpy.props.StringProperty(
+        name="镜像名称模式",
+        description="左右顶点组名称模式，逗号分隔，每项为 左:右，匹配名称的前缀或后缀",
+        default=DEFAULT_MIRROR_PATTERNS
+    )
+    bpy.app.handlers.depsgraph_update_post.append(_on_live_stats_depsgraph_update)
 
 def unregister():
+    global _live_stats_timer_pending
     bpy.utils.unregister_class(DATA_PT_vertex_group_tools)
     bpy.utils.unregister_class(O_VertexGroupsCount)
     bpy.utils.unregister_class(O_VertexGroupsDelNoneActive)
     bpy.utils.unregister_class(O_VertexGroupsMatchRename)
     bpy.utils.unregister_class(O_VertexGroupsSortMatch)
+    bpy.utils.unregister_class(O_VertexGroupsMirror)
 
     del bpy.types.Scene.similarity_threshold
+    del bpy.types.Scene.vertex_group_descriptor_threshold
+    del bpy.types.Scene.vertex_group_weighted_center
+    del bpy.types.Scene.vertex_group_match_metric
+    del bpy.types.Scene.vertex_group_batch_mode
+    del bpy.types.Scene.vertex_group_live_stats
+    del bpy.types.Scene.vertex_group_mirror_patterns
+    if _on_live_stats_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_live_stats_depsgraph_update)
+    if bpy.app.timers.is_registered(_live_stats_timer):
+        bpy.app.timers.unregister(_live_stats_timer)
+    _live_stats_timer_pending = False
+    _live_stats.clear()
+    clear_symmetry_cache()
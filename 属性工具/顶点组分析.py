@@ -0,0 +1,372 @@
+# type: ignore
+import bpy
+import numpy as np
+from typing import Dict, Optional
+from bpy.props import (StringProperty,
+                       IntProperty,
+                       FloatProperty,
+                       EnumProperty,
+                       CollectionProperty)
+from bpy.types import PropertyGroup
+from ..通用工具.权重矩阵 import get_weight_matrix, peek_weight_matrix, find_duplicate_groups, diff_weight_matrices
+from ..通用工具.权重传递 import world_positions
+
+########################## Divider ##########################
+
+# 分析结果项
+class VertexGroupAnalysisItem(PropertyGroup):
+    kind: EnumProperty(
+        name="类型",
+        items=[
+            ('DUPLICATE', '重复', '与另一个顶点组权重相同'),
+            ('DIFF', '差异', '两个网格之间同名顶点组的权重差异')
+        ]
+    )
+    other: StringProperty(name="对应")
+    vertex_count: IntProperty(name="顶点数")
+    max_delta: FloatProperty(name="最大差值")
+    mean_delta: FloatProperty(name="平均差值")
+    changed: IntProperty(name="变化顶点数")
+
+
+class XBONE_UL_VertexGroupAnalysis(bpy.types.UIList):
+    sort_column: EnumProperty(
+        name="排序",
+        items=[
+            ('NAME', '名称', ''),
+            ('COUNT', '顶点数', ''),
+            ('MAX', '最大差值', ''),
+            ('MEAN', '平均差值', ''),
+            ('CHANGED', '变化顶点数', '')
+        ],
+        default='NAME'
+    )
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        if item.kind == 'DUPLICATE':
+            row.label(text=item.name, icon="DUPLICATE")
+            row.label(text=f"= {item.other}")
+            row.label(text=f"{item.vertex_count}")
+        else:
+            row.label(text=item.name, icon="GROUP_VERTEX")
+            row.label(text=f"{item.max_delta:.4f} / {item.mean_delta:.4f}")
+            row.label(text=f"{item.changed}/{item.vertex_count}")
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon="ARROW_LEFTRIGHT")
+        row = layout.row(align=True)
+        row.prop(self, "sort_column", text="")
+        row.prop(self, "use_filter_sort_reverse", text="", icon="SORT_DESC" if self.use_filter_sort_reverse else "SORT_ASC")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+        flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+
+        if self.sort_column == 'NAME':
+            order = helper.sort_items_by_name(items, "name")
+        else:
+            attr = {'COUNT': 'vertex_count', 'MAX': 'max_delta', 'MEAN': 'mean_delta', 'CHANGED': 'changed'}[self.sort_column]
+            order = helper.sort_items_helper([(i, getattr(item, attr)) for i, item in enumerate(items)], key=lambda x: x[1])
+        return flags, order
+
+
+class O_VertexGroupsAnalyze(bpy.types.Operator):
+    bl_idname = "xbone.vertex_groups_analyze"
+    bl_label = "顶点组分析"
+    bl_description = "查找活动物体中权重相同的顶点组，或逐组对比活动物体与另一个选择的网格的权重"
+
+    mode: EnumProperty(
+        items=[
+            ('DUPLICATES', '查重', '查找活动物体中权重相同的顶点组'),
+            ('DIFF', '对比', '逐组对比活动物体与另一个选择的网格')
+        ],
+        default='DUPLICATES'
+    )
+
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'MESH':
+            self.report({'ERROR'}, "请先选择一个Mesh对象作为活动对象。")
+            return {'CANCELLED'}
+
+        scene = context.scene
+        tolerance = scene.vertex_group_analysis_tolerance
+        results = scene.vertex_group_analysis_items
+        results.clear()
+        scene.vertex_group_analysis_index = 0
+
+        # 每个网格只提取一次权重矩阵
+        weight_matrix = get_weight_matrix(obj)
+        if self.mode == 'DUPLICATES':
+            counts = weight_matrix.group_vertex_counts()
+            duplicates = find_duplicate_groups(weight_matrix, tolerance)
+            for indices in duplicates:
+                first = weight_matrix.group_names[indices[0]]
+                for index in indices[1:]:
+                    item = results.add()
+                    item.kind = 'DUPLICATE'
+                    item.name = weight_matrix.group_names[index]
+                    item.other = first
+                    item.vertex_count = int(counts[index])
+            self.report({'INFO'}, f"找到{len(duplicates)}组重复顶点组，共{len(results)}个可删除")
+            return {'FINISHED'}
+
+        others = [o for o in context.selected_objects if o.type == 'MESH' and o != obj]
+        if len(others) != 1:
+            self.report({'ERROR'}, "请再选择一个网格物体作为对比对象")
+            return {'CANCELLED'}
+        other = others[0]
+        try:
+            diff = diff_weight_matrices(weight_matrix, get_weight_matrix(other), tolerance)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        changed_groups = 0
+        for name, (max_delta, mean_delta, changed, touched) in diff.items():
+            item = results.add()
+            item.kind = 'DIFF'
+            item.name = name
+            item.other = other.name
+            item.max_delta = max_delta
+            item.mean_delta = mean_delta
+            item.changed = changed
+            item.vertex_count = touched
+            changed_groups += changed > 0
+        self.report({'INFO'}, f"对比完成：{len(diff)}个顶点组中{changed_groups}个有差异")
+        return {'FINISHED'}
+
+
+def _on_analysis_index_changed(self, context):
+    """点击结果项时切换活动顶点组"""
+    obj = context.active_object
+    if not obj or obj.type != 'MESH' or self.vertex_group_analysis_index >= len(self.vertex_group_analysis_items):
+        return
+    index = obj.vertex_groups.find(self.vertex_group_analysis_items[self.vertex_group_analysis_index].name)
+    if index >= 0:
+        obj.vertex_groups.active_index = index
+
+
+# 网格指针 → (权重矩阵, 世界矩阵, 统计结果)；权重矩阵缓存在网格变化时失效，据此判断是否需要重新计算
+_metrics_cache: Dict[int, tuple] = {}
+_metrics_timer_pending = False
+
+
+def get_group_metrics(obj: bpy.types.Object, check: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """读取物体的顶点组统计缓存
+
+    check 为True时检查网格或变换是否变化，变化后若已有缓存的权重矩阵则安排一次后台重新计算，
+    否则保留旧结果直到手动刷新；逐项绘制时传入False，只做字典查找
+    """
+    cached = _metrics_cache.get(obj.data.as_pointer())
+    if check and obj.mode != 'EDIT':
+        weight_matrix = peek_weight_matrix(obj)
+        stale = (cached is None
+                 or cached[0] is not weight_matrix
+                 or cached[1] != tuple(map(tuple, obj.matrix_world)))
+        if stale and weight_matrix is not None:
+            _schedule_metrics()
+    if cached is None or len(cached[2]['count']) != len(obj.vertex_groups):
+        return None
+    return cached[2]
+
+
+def is_metrics_stale(obj: bpy.types.Object) -> bool:
+    """统计结果是否落后于当前权重（权重矩阵缓存已失效）"""
+    cached = _metrics_cache.get(obj.data.as_pointer())
+    return cached is None or cached[0] is not peek_weight_matrix(obj)
+
+
+def store_group_metrics(obj: bpy.types.Object, weight_matrix) -> None:
+    """由权重矩阵与当前世界坐标计算统计并写入缓存"""
+    metrics = weight_matrix.group_metrics(world_positions(obj))
+    _metrics_cache[obj.data.as_pointer()] = (weight_matrix, tuple(map(tuple, obj.matrix_world)), metrics)
+
+
+def _schedule_metrics() -> None:
+    global _metrics_timer_pending
+    if not _metrics_timer_pending:
+        _metrics_timer_pending = True
+        bpy.app.timers.register(_metrics_timer, first_interval=0.1)
+
+
+def _metrics_timer():
+    """计时器回调：用已缓存的权重矩阵一次向量化计算所有顶点组的统计，然后刷新面板
+
+    不在计时器中提取权重，避免绘制权重或编辑后面板打开时卡住界面
+    """
+    global _metrics_timer_pending
+    _metrics_timer_pending = False
+
+    context = bpy.context
+    obj = context.view_layer.objects.active if context.view_layer else None
+    if obj is None or obj.type != 'MESH' or obj.mode == 'EDIT':
+        return None
+
+    weight_matrix = peek_weight_matrix(obj)
+    if weight_matrix is None:
+        return None
+    store_group_metrics(obj, weight_matrix)
+
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return None
+
+
+class O_VertexGroupMetricsRefresh(bpy.types.Operator):
+    bl_idname = "xbone.vertex_group_metrics_refresh"
+    bl_label = "刷新统计"
+    bl_description = "重新提取活动网格的权重并计算所有顶点组的统计"
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.mode != 'EDIT'
+
+    def execute(self, context):
+        store_group_metrics(context.active_object, get_weight_matrix(context.active_object))
+        return {'FINISHED'}
+
+
+class XBONE_UL_VertexGroupMetrics(bpy.types.UIList):
+    sort_column: EnumProperty(
+        name="排序",
+        items=[
+            ('INDEX', '顺序', ''),
+            ('NAME', '名称', ''),
+            ('COUNT', '顶点数', ''),
+            ('SUM', '权重和', ''),
+            ('MAX', '最大权重', ''),
+            ('SIZE', '包围盒尺寸', '')
+        ],
+        default='INDEX'
+    )
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        metrics = get_group_metrics(data, check=False)
+        row = layout.row(align=True)
+        row.label(text=item.name, icon="GROUP_VERTEX")
+        if metrics is None:
+            return
+        i = item.index
+        row.label(text=f"{metrics['count'][i]}")
+        row.label(text=f"{metrics['sum'][i]:.2f}")
+        row.label(text=f"{metrics['max'][i]:.3f}")
+        row.label(text=f"{metrics['size'][i]:.3f}")
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon="ARROW_LEFTRIGHT")
+        row = layout.row(align=True)
+        row.prop(self, "sort_column", text="")
+        row.prop(self, "use_filter_sort_reverse", text="", icon="SORT_DESC" if self.use_filter_sort_reverse else "SORT_ASC")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+        flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+
+        metrics = get_group_metrics(data)
+        if self.sort_column == 'NAME':
+            order = helper.sort_items_by_name(items, "name")
+        elif self.sort_column == 'INDEX' or metrics is None:
+            order = []
+        else:
+            values = metrics[self.sort_column.lower()]
+            order = np.argsort(np.argsort(values, kind='stable'), kind='stable').tolist()
+        return flags, order
+
+
+class DATA_PT_vertex_group_analysis(bpy.types.Panel):
+    bl_label = "顶点组分析"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'XBone'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        # 只有当主面板激活了此子面板时才显示
+        return getattr(context.scene, 'active_xbone_subpanel', '') == 'AttributeTools'
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        col = layout.column(align=True)
+        row = col.row(align=True)
+        row.prop(scene, "vertex_group_analysis_tolerance")
+        row.operator(O_VertexGroupsAnalyze.bl_idname, text="查重", icon="DUPLICATE").mode = 'DUPLICATES'
+        row.operator(O_VertexGroupsAnalyze.bl_idname, text="对比", icon="ARROW_LEFTRIGHT").mode = 'DIFF'
+        col.template_list("XBONE_UL_VertexGroupAnalysis", "", scene, "vertex_group_analysis_items",
+                          scene, "vertex_group_analysis_index", rows=6)
+
+        # 逐组统计：顶点数、权重和、最大权重、世界空间包围盒
+        obj = context.object
+        if obj is None or obj.type != 'MESH':
+            return
+        col = layout.column(align=True)
+        row = col.row(align=True)
+        for text in ("名称", "顶点", "权重和", "最大", "尺寸"):
+            row.label(text=text)
+        row.operator(O_VertexGroupMetricsRefresh.bl_idname, text="", icon="FILE_REFRESH")
+        col.template_list("XBONE_UL_VertexGroupMetrics", "", obj, "vertex_groups",
+                          obj.vertex_groups, "active_index", rows=6)
+        metrics = get_group_metrics(obj)
+        active_vg = obj.vertex_groups.active
+        if metrics is not None and active_vg and metrics['count'][active_vg.index]:
+            low, high = metrics['aabb_min'][active_vg.index], metrics['aabb_max'][active_vg.index]
+            col.label(text=f"最小 ({low[0]:.3f}, {low[1]:.3f}, {low[2]:.3f})")
+            col.label(text=f"最大 ({high[0]:.3f}, {high[1]:.3f}, {high[2]:.3f})")
+        if is_metrics_stale(obj):
+            col.label(text="权重已修改，点击刷新更新统计", icon="TIME")
+
+########################## Divider ##########################
+
+def register():
+    bpy.utils.register_class(VertexGroupAnalysisItem)
+    bpy.utils.register_class(XBONE_UL_VertexGroupAnalysis)
+    bpy.utils.register_class(XBONE_UL_VertexGroupMetrics)
+    bpy.utils.register_class(O_VertexGroupMetricsRefresh)
+    bpy.utils.register_class(O_VertexGroupsAnalyze)
+    bpy.utils.register_class(DATA_PT_vertex_group_analysis)
+
+    bpy.types.Scene.vertex_group_analysis_items = CollectionProperty(
+        type=VertexGroupAnalysisItem
+    )
+    bpy.types.Scene.vertex_group_analysis_index = IntProperty(
+        default=0,
+        update=_on_analysis_index_changed
+    )
+    bpy.types.Scene.vertex_group_analysis_tolerance = FloatProperty(
+        name="容差",
+        description="权重量化精度：差值小于该值的权重视为相同",
+        default=0.001,
+        min=0.00001,
+        max=0.1,
+        precision=5
+    )
+
+def unregister():
+    global _metrics_timer_pending
+    bpy.utils.unregister_class(VertexGroupAnalysisItem)
+    bpy.utils.unregister_class(XBONE_UL_VertexGroupAnalysis)
+    bpy.utils.unregister_class(XBONE_UL_VertexGroupMetrics)
+    bpy.utils.unregister_class(O_VertexGroupMetricsRefresh)
+    bpy.utils.unregister_class(O_VertexGroupsAnalyze)
+    bpy.utils.unregister_class(DATA_PT_vertex_group_analysis)
+
+    del bpy.types.Scene.vertex_group_analysis_items
+    del bpy.types.Scene.vertex_group_analysis_index
+    del bpy.types.Scene.vertex_group_analysis_tolerance
+    if bpy.app.timers.is_registered(_metrics_timer):
+        bpy.app.timers.unregister(_metrics_timer)
+    _metrics_timer_pending = False
+    _metrics_cache.clear()
@@ -0,0 +1,277 @@
+# type: ignore
+import numpy as np
+from mathutils.kdtree import KDTree
+from typing import Dict, List, Optional, Tuple
+
+# 组数超过该值时默认启用KD树剪枝
+KDTREE_PRUNE_THRESHOLD = 1000
+
+########################## Divider ##########################
+
+def pairwise_distances(points_a: np.ndarray, points_b: np.ndarray) -> np.ndarray:
+    """向量化计算 (A, B) 欧氏距离矩阵"""
+    points_a = np.asarray(points_a, dtype=np.float64).reshape(len(points_a), -1)
+    points_b = np.asarray(points_b, dtype=np.float64).reshape(len(points_b), -1)
+    sq = (
+        np.einsum('ij,ij->i', points_a, points_a)[:, None]
+        + np.einsum('ij,ij->i', points_b, points_b)[None, :]
+        - 2.0 * points_a @ points_b.T
+    )
+    return np.sqrt(np.maximum(sq, 0.0))
+
+
+def similarity_to_distance(similarity_threshold: float) -> float:
+    """相似度 1/(1+d) 的阈值换算为最大允许距离"""
+    if similarity_threshold <= 0:
+        return np.inf
+    return 1.0 / similarity_threshold - 1.0
+
+
+def linear_sum_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """匈牙利算法（最短增广路径 + 势函数）求解矩形代价矩阵的最小代价匹配
+
+    不依赖SciPy，内层循环按列向量化，复杂度 O(n²·m)，n = min(A, B)。
+    返回 (行索引, 列索引)，按行索引升序
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # 1起始索引，0号列为虚拟列
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: 分配到列j的行
+    way = np.zeros(m + 1, dtype=np.int64)  # 增广路径上的前驱列
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        # 沿增广路径翻转匹配
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _solve_dense(cost: np.ndarray, max_cost: float) -> List[Tuple[int, int, float]]:
+    """求解稠密代价矩阵，超过 max_cost 的配对视为不可匹配"""
+    allowed = cost <= max_cost
+    if not allowed.any():
+        return []
+
+    # 不可匹配的配对使用足够大的代价：先保证匹配数量最多，再保证总代价最小
+    penalty = (float(cost[allowed].max()) + 1.0) * (min(cost.shape) + 1)
+    solvable = np.where(allowed, cost, penalty)
+    rows, cols = linear_sum_assignment(solvable)
+
+    keep = allowed[rows, cols]
+    return [(int(i), int(j), float(cost[i, j])) for i, j in zip(rows[keep], cols[keep])]
+
+
+def candidate_pairs_kdtree(points_a: np.ndarray, points_b: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """用KD树找出距离不超过 radius 的所有 (a, b) 候选配对"""
+    tree = KDTree(len(points_a))
+    for i, co in enumerate(points_a):
+        tree.insert(co, i)
+    tree.balance()
+
+    rows, cols = [], []
+    for j, co in enumerate(points_b):
+        for _, i, _ in tree.find_range(co, radius):
+            rows.append(i)
+            cols.append(j)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def _connected_components(rows: np.ndarray, cols: np.ndarray, num_a: int, num_b: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """二分图候选边的连通分量（并查集），返回每个分量的 (A索引, B索引)"""
+    parent = list(range(num_a + num_b))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in zip(rows, cols):
+        ra, rb = find(int(i)), find(num_a + int(j))
+        if ra != rb:
+            parent[ra] = rb
+
+    components = {}
+    for i in np.unique(rows):
+        components.setdefault(find(int(i)), ([], []))[0].append(int(i))
+    for j in np.unique(cols):
+        components.setdefault(find(num_a + int(j)), ([], []))[1].append(int(j))
+    return [(np.array(a), np.array(b)) for a, b in components.values()]
+
+
+def _assign(points_a: np.ndarray,
+            points_b: np.ndarray,
+            cost_fn,
+            max_cost: float,
+            use_kdtree: Optional[bool]) -> List[Tuple[int, int, float]]:
+    """通用最优匹配流程，cost_fn(A索引数组, B索引数组) 返回对应子集的代价矩阵
+
+    要求代价不小于 points 间的欧氏距离，这样KD树按 max_cost 半径剪枝不会漏掉可行配对
+    """
+    num_a, num_b = len(points_a), len(points_b)
+    if num_a == 0 or num_b == 0:
+        return []
+
+    if use_kdtree is None:
+        use_kdtree = np.isfinite(max_cost) and max(num_a, num_b) >= KDTREE_PRUNE_THRESHOLD
+    if not use_kdtree or not np.isfinite(max_cost):
+        return _solve_dense(cost_fn(np.arange(num_a), np.arange(num_b)), max_cost)
+
+    rows, cols = candidate_pairs_kdtree(points_a, points_b, max_cost)
+    matches = []
+    for comp_a, comp_b in _connected_components(rows, cols, num_a, num_b):
+        for i, j, cost in _solve_dense(cost_fn(comp_a, comp_b), max_cost):
+            matches.append((int(comp_a[i]), int(comp_b[j]), cost))
+    return matches
+
+
+def assign_by_distance(points_a: np.ndarray,
+                       points_b: np.ndarray,
+                       max_distance: float = np.inf,
+                       use_kdtree: Optional[bool] = None) -> List[Tuple[int, int, float]]:
+    """按位置距离求全局最优一对一匹配
+
+    返回 [(A索引, B索引, 距离)]，只包含距离不超过 max_distance 的配对。
+    use_kdtree 为None时，组数达到 KDTREE_PRUNE_THRESHOLD 且距离有上限则自动启用剪枝：
+    KD树只保留半径内的候选边，再按连通分量分别求解
+    """
+    points_a = np.asarray(points_a, dtype=np.float64)
+    points_b = np.asarray(points_b, dtype=np.float64)
+
+    def cost_fn(idx_a, idx_b):
+        return pairwise_distances(points_a[idx_a], points_b[idx_b])
+
+    return _assign(points_a, points_b, cost_fn, max_distance, use_kdtree)
+
+def assign_by_features(features_a: np.ndarray,
+                       features_b: np.ndarray,
+                       max_distance: float = np.inf,
+                       use_kdtree: Optional[bool] = None) -> List[Tuple[int, int, float]]:
+    """按特征向量的欧氏距离求全局最优一对一匹配
+
+    特征的前3列必须是位置，其余列为长度单位的附加特征；
+    特征距离不小于位置距离，因此KD树可以只按位置剪枝
+    """
+    features_a = np.asarray(features_a, dtype=np.float64)
+    features_b = np.asarray(features_b, dtype=np.float64)
+
+    def cost_fn(idx_a, idx_b):
+        return pairwise_distances(features_a[idx_a], features_b[idx_b])
+
+    return _assign(features_a[:, :3], features_b[:, :3], cost_fn, max_distance, use_kdtree)
+
+########################## Divider ##########################
+
+# 组合度量中各项的权重
+DESCRIPTOR_METRIC_WEIGHTS = {
+    'aabb': 0.5,        # 包围盒角点距离
+    'covariance': 1.0,  # 协方差差异（开方后为长度单位，能区分镜像的左右组）
+    'mass': 0.25,       # 总权重比例差异，按两组的平均分布半径换算为长度
+}
+
+
+def descriptor_distance_matrix(desc_a: Dict[str, np.ndarray],
+                               desc_b: Dict[str, np.ndarray],
+                               idx_a: Optional[np.ndarray] = None,
+                               idx_b: Optional[np.ndarray] = None,
+                               metric_weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """向量化计算两组描述符之间的组合距离矩阵 (A, B)
+
+    组合距离 = 中心距离 + Σ 权重 × 各项差异，各项均为长度单位，
+    因此沿用 相似度 = 1/(1+距离) 的阈值含义，并且不小于中心距离
+    """
+    weights = DESCRIPTOR_METRIC_WEIGHTS if metric_weights is None else metric_weights
+    if idx_a is None:
+        idx_a = np.arange(len(desc_a['centroid']))
+    if idx_b is None:
+        idx_b = np.arange(len(desc_b['centroid']))
+
+    cost = pairwise_distances(desc_a['centroid'][idx_a], desc_b['centroid'][idx_b])
+
+    if weights.get('aabb'):
+        aabb_a = np.concatenate([desc_a['aabb_min'][idx_a], desc_a['aabb_max'][idx_a]], axis=1)
+        aabb_b = np.concatenate([desc_b['aabb_min'][idx_b], desc_b['aabb_max'][idx_b]], axis=1)
+        cost += weights['aabb'] * pairwise_distances(aabb_a, aabb_b) / np.sqrt(2.0)
+
+    if weights.get('covariance'):
+        cov_a = desc_a['covariance'][idx_a].reshape(len(idx_a), 9)
+        cov_b = desc_b['covariance'][idx_b].reshape(len(idx_b), 9)
+        cost += weights['covariance'] * np.sqrt(pairwise_distances(cov_a, cov_b))
+
+    if weights.get('mass'):
+        log_a = np.log(np.maximum(desc_a['total_weight'][idx_a], 1e-12))
+        log_b = np.log(np.maximum(desc_b['total_weight'][idx_b], 1e-12))
+        radius_a = np.linalg.norm(desc_a['spread'][idx_a], axis=1)
+        radius_b = np.linalg.norm(desc_b['spread'][idx_b], axis=1)
+        radius = 0.5 * (radius_a[:, None] + radius_b[None, :])
+        cost += weights['mass'] * np.abs(log_a[:, None] - log_b[None, :]) * radius
+
+    return cost
+
+
+def assign_by_descriptors(desc_a: Dict[str, np.ndarray],
+                          desc_b: Dict[str, np.ndarray],
+                          max_cost: float = np.inf,
+                          use_kdtree: Optional[bool] = None,
+                          metric_weights: Optional[Dict[str, float]] = None) -> List[Tuple[int, int, float]]:
+    """按组合描述符距离求全局最优一对一匹配，返回 [(A索引, B索引, 组合距离)]"""
+
+    def cost_fn(idx_a, idx_b):
+        return descriptor_distance_matrix(desc_a, desc_b, idx_a, idx_b, metric_weights)
+
+    return _assign(desc_a['centroid'], desc_b['centroid'], cost_fn, max_cost, use_kdtree)
+
+########################## Divider ##########################
+
+def apply_renames(collection, rename_map: dict) -> int:
+    """两阶段重命名集合中的元素（顶点组、形态键等），避免中途重名产生 .001 后缀
+
+    先全部改为临时名称，再改为目标名称；返回重命名数量
+    """
+    items = [(collection[old], new) for old, new in rename_map.items() if old != new and old in collection]
+    for index, (item, _) in enumerate(items):
+        item.name = f"__xbone_tmp_{index}__"
+    for item, new in items:
+        item.name = new
+    return len(items)
@@ -0,0 +1,527 @@
+# type: ignore
+import bpy
+import numpy as np
+import tempfile
+from typing import List, Optional, Tuple
+from .权重传递 import SurfaceProjector, world_positions
+from .权重矩阵 import get_weight_matrix
+
+# 超过该字节数时形态键数组改用临时文件内存映射
+MEMMAP_THRESHOLD = 256 * 1024 * 1024
+
+# 逐块处理形态键时每块的键数量，限制中间数组的内存占用
+KEY_CHUNK = 32
+
+# 位移小于该值的顶点不计入形态键影响范围
+DELTA_EPSILON = 1e-5
+
+########################## Divider ##########################
+
+def allocate_key_array(num_keys: int, num_vertices: int) -> np.ndarray:
+    """分配连续的 (K, V, 3) float32 数组，较大时使用内存映射"""
+    shape = (num_keys, num_vertices, 3)
+    if num_keys * num_vertices * 3 * 4 > MEMMAP_THRESHOLD:
+        return np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode='w+', shape=shape)
+    return np.empty(shape, dtype=np.float32)
+
+
+def extract_shape_keys(mesh: bpy.types.Mesh, names: Optional[List[str]] = None) -> Tuple[np.ndarray, List[str]]:
+    """一次把形态键坐标读取到连续的 (K, V, 3) float32 数组
+
+    key_blocks 的 co 为绝对坐标；names 为None时读取全部形态键（包括基础形态键）。
+    返回 (坐标数组, 名称列表)，数组第一维与名称列表一一对应
+    """
+    key_blocks = mesh.shape_keys.key_blocks
+    names = [kb.name for kb in key_blocks] if names is None else list(names)
+    coords = allocate_key_array(len(names), len(mesh.vertices))
+    for k, name in enumerate(names):
+        key_blocks[name].data.foreach_get('co', coords[k].reshape(-1))
+    return coords, names
+
+
+def relative_key_indices(mesh: bpy.types.Mesh, names: List[str]) -> np.ndarray:
+    """每个形态键的 relative_key 在 names 中的索引，不在其中时为-1"""
+    key_blocks = mesh.shape_keys.key_blocks
+    position = {name: i for i, name in enumerate(names)}
+    return np.array([position.get(key_blocks[name].relative_key.name, -1) for name in names], dtype=np.int64)
+
+
+def iter_deltas(coords: np.ndarray, relative: np.ndarray, chunk: int = KEY_CHUNK):
+    """逐块生成 (起始索引, (k, V, 3) 相对位移)，避免一次复制整个数组"""
+    for start in range(0, len(coords), chunk):
+        stop = min(start + chunk, len(coords))
+        rel = relative[start:stop]
+        block = np.asarray(coords[start:stop])
+        base = np.asarray(coords[np.where(rel >= 0, rel, np.arange(start, stop))])
+        yield start, block - base
+
+########################## Divider ##########################
+
+def delta_fingerprints(mesh: bpy.types.Mesh,
+                       matrix_world,
+                       epsilon: float = DELTA_EPSILON) -> Tuple[List[str], np.ndarray]:
+    """计算每个非基础形态键相对 relative_key 的位移指纹（世界空间）
+
+    返回 (名称列表, (K, 7) 指纹)，各列均为长度单位：
+      [0:3] 受影响顶点按位移大小加权的中心
+      [3:6] 主位移方向 × 均方根位移（符号统一为最大分量为正）
+      [6]   受影响顶点的平均位移大小
+    没有受影响顶点的形态键使用网格中心、位移为0
+    """
+    key_blocks = mesh.shape_keys.key_blocks
+    names = [kb.name for kb in key_blocks if kb.relative_key != kb]
+    if not names:
+        return names, np.zeros((0, 7))
+
+    all_names = [kb.name for kb in key_blocks]
+    coords, _ = extract_shape_keys(mesh, all_names)
+    relative = relative_key_indices(mesh, all_names)
+    selected = np.array([all_names.index(name) for name in names])
+
+    matrix = np.array(matrix_world)
+    linear, offset = matrix[:3, :3], matrix[:3, 3]
+    basis = np.asarray(coords[0], dtype=np.float64) @ linear.T + offset
+
+    fingerprints = np.zeros((len(all_names), 7))
+    for start, deltas in iter_deltas(coords, relative):
+        deltas = deltas.astype(np.float64) @ linear.T                  # (k, V, 3) 世界空间位移
+        magnitude = np.linalg.norm(deltas, axis=2)                      # (k, V)
+        magnitude = np.where(magnitude > epsilon, magnitude, 0.0)
+        deltas[magnitude == 0] = 0.0
+        total = magnitude.sum(axis=1)                                   # (k,)
+        affected = np.count_nonzero(magnitude, axis=1)
+        valid = total > 0
+        safe_total = np.where(valid, total, 1.0)
+
+        centroid = (magnitude @ basis) / safe_total[:, None]
+        centroid[~valid] = basis.mean(axis=0)
+
+        # 位移二阶矩的主特征向量，缩放到均方根位移
+        moment = np.einsum('kvi,kvj->kij', deltas, deltas) / np.maximum(affected, 1)[:, None, None]
+        eigvals, eigvecs = np.linalg.eigh(moment)
+        direction = eigvecs[:, :, -1] * np.sqrt(np.maximum(eigvals[:, -1], 0.0))[:, None]
+        flip = np.take_along_axis(direction, np.argmax(np.abs(direction), axis=1)[:, None], axis=1) < 0
+        direction = np.where(flip, -direction, direction)
+
+        stop = start + len(deltas)
+        fingerprints[start:stop, 0:3] = centroid
+        fingerprints[start:stop, 3:6] = direction
+        fingerprints[start:stop, 6] = total / np.maximum(affected, 1)
+
+    return names, fingerprints[selected]
+
+########################## Divider ##########################
+
+# 需要移动的形态键不超过该数量时使用 shape_key_move(TOP/BOTTOM) 而不是重建
+MOVE_FAST_PATH_MAX = 16
+
+# 重建形态键时一并还原的属性
+KEY_BLOCK_ATTRIBUTES = ('slider_min', 'slider_max', 'value', 'vertex_group', 'mute', 'interpolation', 'lock_shape')
+
+
+def set_slider_range(key_block: bpy.types.ShapeKey, slider_min: float, slider_max: float) -> None:
+    """设置滑块范围；Blender 要求 min < max，按顺序赋值避免被钳制"""
+    key_block.slider_max = slider_max
+    key_block.slider_min = slider_min
+    key_block.slider_max = slider_max
+
+
+def plan_bottom_moves(current: List[str], desired: List[str]) -> List[str]:
+    """求只用"移到底部"把 current 排成 desired 所需移动的形态键（按移动顺序）
+
+    desired 中能作为 current 子序列保持相对顺序的最长前缀不需要移动，其余按 desired 顺序依次移到底部
+    """
+    position = 0
+    kept = 0
+    for name in desired:
+        try:
+            position = current.index(name, position) + 1
+        except ValueError:
+            break
+        kept += 1
+    return desired[kept:]
+
+
+def reorder_shape_keys(obj: bpy.types.Object, desired: List[str]) -> dict:
+    """按 desired 顺序一次性重排物体的形态键
+
+    desired 中缺少的形态键按原顺序追加在最后。需要移动的键较少时用 shape_key_move(TOP/BOTTOM)；
+    否则从第一个不一致的位置开始，把其后的形态键快照到 (K, V, 3) 数组后删除并按新顺序重建，
+    同时还原 relative_key、滑块范围、值、顶点组、静音等属性。
+    返回 {'method': 使用的方式, 'operations': 移动次数或重建数量}
+    """
+    key_blocks = obj.data.shape_keys.key_blocks
+    current = [kb.name for kb in key_blocks]
+    listed = set(desired)
+    desired = [name for name in dict.fromkeys(desired) if name in key_blocks] + [name for name in current if name not in listed]
+    if desired == current:
+        return {'method': 'NONE', 'operations': 0}
+
+    active_name = obj.active_shape_key.name if obj.active_shape_key else None
+    operations = 0
+
+    # 基础形态键不同：只能移动到顶部（不能删除基础形态键，否则会丢失形态键数据块上的动画与驱动）
+    # shape_key_move(TOP) 不会越过当前基础形态键，最后一步用 UP 移到索引0
+    index = key_blocks.find(desired[0])
+    while index > 0:
+        obj.active_shape_key_index = index
+        bpy.ops.object.shape_key_move(type='UP' if index == 1 else 'TOP')
+        new_index = key_blocks.find(desired[0])
+        if new_index >= index:
+            raise RuntimeError(f"无法把形态键 {desired[0]} 移动到顶部")
+        index = new_index
+        operations += 1
+    current = [kb.name for kb in key_blocks]
+
+    moves = plan_bottom_moves(current, desired)
+    prefix = next((i for i, (a, b) in enumerate(zip(current, desired)) if a != b), len(current))
+    rebuild = desired[prefix:]
+
+    if len(moves) <= MOVE_FAST_PATH_MAX and len(moves) < len(rebuild):
+        for name in moves:
+            obj.active_shape_key_index = key_blocks.find(name)
+            bpy.ops.object.shape_key_move(type='BOTTOM')
+        method, operations = 'MOVE', operations + len(moves)
+    elif rebuild:
+        if prefix < 1:
+            raise RuntimeError("重建形态键时不能删除基础形态键")
+        # 快照：全部形态键的 relative_key，以及待重建形态键的坐标和属性
+        relative = {kb.name: kb.relative_key.name for kb in key_blocks}
+        coords, _ = extract_shape_keys(obj.data, rebuild)
+        attributes = [{attr: getattr(key_blocks[name], attr) for attr in KEY_BLOCK_ATTRIBUTES if hasattr(key_blocks[name], attr)}
+                      for name in rebuild]
+
+        for name in reversed(current[prefix:]):
+            obj.shape_key_remove(key_blocks[name])
+        for k, name in enumerate(rebuild):
+            kb = obj.shape_key_add(name=name, from_mix=False)
+            kb.data.foreach_set('co', coords[k].reshape(-1))
+            # 先还原滑块范围，否则超出默认 0..1 范围的值会被钳制
+            set_slider_range(kb, attributes[k]['slider_min'], attributes[k]['slider_max'])
+            for attr, value in attributes[k].items():
+                if attr not in ('slider_min', 'slider_max'):
+                    setattr(kb, attr, value)
+
+        for name, relative_name in relative.items():
+            if relative_name in key_blocks and key_blocks[name].relative_key.name != relative_name:
+                key_blocks[name].relative_key = key_blocks[relative_name]
+        obj.data.update()
+        method, operations = 'REBUILD', operations + len(rebuild)
+    else:
+        method = 'MOVE'
+
+    if active_name is not None:
+        obj.active_shape_key_index = key_blocks.find(active_name)
+    return {'method': method, 'operations': operations}
+
+########################## Divider ##########################
+
+# 稀疏位移文件的格式版本
+DELTA_FILE_VERSION = 1
+
+
+def export_shape_key_deltas(mesh: bpy.types.Mesh,
+                            filepath: str,
+                            precision: str = 'FLOAT16',
+                            epsilon: float = DELTA_EPSILON) -> Tuple[int, int]:
+    """把所有非基础形态键相对基础形态键的位移以稀疏形式写入压缩NPZ
+
+    每个形态键只保存位移超过 epsilon 的顶点索引与位移（CSR布局：offsets/indices/deltas），
+    同时保存 relative_key 与滑块属性。返回 (形态键数量, 保存的位移数量)
+    """
+    key_blocks = mesh.shape_keys.key_blocks
+    reference = mesh.shape_keys.reference_key
+    names = [kb.name for kb in key_blocks if kb != reference]
+    coords, _ = extract_shape_keys(mesh, [reference.name] + names)
+    base = np.asarray(coords[0])
+    dtype = np.float16 if precision == 'FLOAT16' else np.float32
+
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    indices, deltas = [], []
+    for start in range(1, len(coords), KEY_CHUNK):
+        block = np.asarray(coords[start:start + KEY_CHUNK]) - base      # (k, V, 3)
+        moved = np.abs(block).max(axis=2) > epsilon                      # (k, V)
+        for k in range(len(block)):
+            vertex_ids = np.flatnonzero(moved[k])
+            indices.append(vertex_ids.astype(np.uint32))
+            deltas.append(block[k, vertex_ids].astype(dtype))
+            offsets[start + k] = offsets[start + k - 1] + len(vertex_ids)
+
+    np.savez_compressed(
+        filepath,
+        version=np.array(DELTA_FILE_VERSION),
+        vertex_count=np.array(len(mesh.vertices)),
+        names=np.array(names, dtype=str),
+        relative=np.array([key_blocks[name].relative_key.name for name in names], dtype=str),
+        slider_min=np.array([key_blocks[name].slider_min for name in names], dtype=np.float32),
+        slider_max=np.array([key_blocks[name].slider_max for name in names], dtype=np.float32),
+        value=np.array([key_blocks[name].value for name in names], dtype=np.float32),
+        offsets=offsets,
+        indices=np.concatenate(indices) if indices else np.zeros(0, dtype=np.uint32),
+        deltas=np.concatenate(deltas) if deltas else np.zeros((0, 3), dtype=dtype),
+    )
+    return len(names), int(offsets[-1])
+
+
+def import_shape_key_deltas(obj: bpy.types.Object, filepath: str, overwrite: bool = True) -> Tuple[int, int]:
+    """从稀疏位移NPZ导入形态键：基础坐标加上位移后一次 foreach_set 写入
+
+    已存在的同名形态键在 overwrite 为True时被覆盖，否则跳过。返回 (写入数量, 跳过数量)
+    """
+    with np.load(filepath) as data:
+        if int(data['vertex_count']) != len(obj.data.vertices):
+            raise ValueError(f"顶点数量不一致：文件 {int(data['vertex_count'])}，物体 {len(obj.data.vertices)}")
+        names = [str(name) for name in data['names']]
+        relative = [str(name) for name in data['relative']]
+        slider_min, slider_max, value = data['slider_min'], data['slider_max'], data['value']
+        offsets, indices = data['offsets'], data['indices'].astype(np.int64)
+        deltas = data['deltas'].astype(np.float32)
+
+    if not obj.data.shape_keys:
+        obj.shape_key_add(name="Basis", from_mix=False)
+    key_blocks = obj.data.shape_keys.key_blocks
+    reference = obj.data.shape_keys.reference_key
+    base = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    reference.data.foreach_get('co', base)
+    base = base.reshape(-1, 3)
+
+    written, skipped = 0, 0
+    co = np.empty_like(base)
+    for k, name in enumerate(names):
+        kb = key_blocks.get(name)
+        if kb is not None and not overwrite:
+            skipped += 1
+            continue
+        if kb is None:
+            kb = obj.shape_key_add(name=name, from_mix=False)
+        co[:] = base
+        co[indices[offsets[k]:offsets[k + 1]]] += deltas[offsets[k]:offsets[k + 1]]
+        kb.data.foreach_set('co', co.reshape(-1))
+        set_slider_range(kb, float(slider_min[k]), float(slider_max[k]))
+        kb.value = float(value[k])
+        written += 1
+
+    # relative_key 在全部形态键创建后按名称还原
+    for name, relative_name in zip(names, relative):
+        if name in key_blocks and relative_name in key_blocks:
+            key_blocks[name].relative_key = key_blocks[relative_name]
+    obj.data.update()
+    return written, skipped
+
+########################## Divider ##########################
+
+def vertex_group_mask(obj: bpy.types.Object, group_name: str) -> Optional[np.ndarray]:
+    """顶点组的逐顶点权重 (V,)，不在组中的顶点为0；顶点组不存在时返回None"""
+    if not group_name or group_name not in obj.vertex_groups:
+        return None
+    weight_matrix = get_weight_matrix(obj)
+    mask = np.zeros(weight_matrix.num_vertices, dtype=np.float32)
+    rows, data = weight_matrix.column(weight_matrix.group_index(group_name))
+    mask[rows] = data
+    return mask
+
+
+def transfer_shape_keys(projector: SurfaceProjector,
+                        source: bpy.types.Object,
+                        target: bpy.types.Object,
+                        names: Optional[List[str]] = None,
+                        mask: Optional[np.ndarray] = None,
+                        max_distance: float = 0.0,
+                        overwrite: bool = True) -> Tuple[int, int, float]:
+    """把源物体的形态键位移按表面对应关系传递到目标物体
+
+    对应关系（每个目标顶点最近表面三角形的角点与重心坐标）由 projector 只计算一次，
+    所有形态键的位移按块做一次 (k, V, 3) gather 插值；位移在世界空间中换算，
+    mask 为目标的逐顶点系数，max_distance > 0 时更远的顶点不受影响。
+    names 为None时传递全部非基础形态键。返回 (写入数量, 跳过数量, 最大表面距离)
+    """
+    if target.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法传递形态键，请先切换到物体模式")
+
+    source_keys = source.data.shape_keys
+    reference = source_keys.reference_key
+    if names is None:
+        names = [kb.name for kb in source_keys.key_blocks if kb != reference]
+    if not target.data.shape_keys:
+        target.shape_key_add(name="Basis", from_mix=False)
+    key_blocks = target.data.shape_keys.key_blocks
+    requested = len(names)
+    names = [name for name in names if overwrite or name not in key_blocks]
+    skipped = requested - len(names)
+
+    corners, bary, distances = projector.project(world_positions(target))
+    finite = np.isfinite(distances)
+    scale = np.where(finite, 1.0, 0.0)
+    if max_distance > 0:
+        scale[distances > max_distance] = 0.0
+    if mask is not None:
+        scale = scale * mask
+    coefficients = (bary * scale[:, None]).astype(np.float32)           # (V, 3)
+
+    # 源局部位移 → 世界空间 → 目标局部空间：delta @ (T⁻¹ · S)ᵀ
+    source_linear = np.array(source.matrix_world)[:3, :3]
+    target_linear = np.array(target.matrix_world)[:3, :3]
+    transform = (np.linalg.inv(target_linear) @ source_linear).T.astype(np.float32)
+
+    coords, _ = extract_shape_keys(source.data, [reference.name] + names)
+    base = np.empty(len(target.data.vertices) * 3, dtype=np.float32)
+    target.data.shape_keys.reference_key.data.foreach_get('co', base)
+    base = base.reshape(-1, 3)
+    source_base = np.asarray(coords[0])
+
+    for start in range(1, len(coords), KEY_CHUNK):
+        deltas = np.asarray(coords[start:start + KEY_CHUNK]) - source_base      # (k, Vs, 3)
+        # gather：每个目标顶点取三个角点的位移按重心坐标加权
+        gathered = np.einsum('kvcj,vc->kvj', deltas[:, corners], coefficients)  # (k, V, 3)
+        gathered = gathered @ transform
+        for k, name in enumerate(names[start - 1:start - 1 + len(deltas)]):
+            kb = key_blocks.get(name)
+            if kb is None:
+                kb = target.shape_key_add(name=name, from_mix=False)
+            kb.data.foreach_set('co', (base + gathered[k]).reshape(-1))
+            source_kb = source_keys.key_blocks[name]
+            set_slider_range(kb, source_kb.slider_min, source_kb.slider_max)
+
+    # relative_key 在全部形态键创建后按名称还原
+    target_reference = target.data.shape_keys.reference_key
+    for name in names:
+        relative_name = source_keys.key_blocks[name].relative_key.name
+        relative = target_reference if relative_name == reference.name else key_blocks.get(relative_name)
+        if relative is not None:
+            key_blocks[name].relative_key = relative
+    target.data.update()
+    return len(names), skipped, float(distances[finite].max()) if finite.any() else 0.0
+
+########################## Divider ##########################
+
+def clean_shape_keys(obj: bpy.types.Object,
+                     threshold: float = 1e-4,
+                     epsilon: float = 0.0) -> dict:
+    """删除空形态键并清理微小位移
+
+    一次提取全部形态键为 (K, V, 3) 数组，逐块计算每个键相对 relative_key 的最大位移长度；
+    最大位移小于 threshold 的非基础形态键被删除（以它为 relative_key 的形态键改为指向它的 relative_key）。
+    epsilon > 0 时，保留的形态键中位移长度小于 epsilon 的顶点坐标被置为 relative_key 的坐标，
+    有变化的形态键用一次 foreach_set 写回。
+    返回 {'removed': 删除的名称列表, 'zeroed': 清零的顶点位移数量, 'rewritten': 写回的形态键数量,
+          'bytes_saved': 删除形态键释放的坐标内存}
+    """
+    if obj.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法清理形态键，请先切换到物体模式")
+
+    mesh = obj.data
+    key_blocks = mesh.shape_keys.key_blocks
+    reference = mesh.shape_keys.reference_key
+    coords, names = extract_shape_keys(mesh)
+    relative = relative_key_indices(mesh, names)
+
+    max_delta = np.zeros(len(names))
+    small = {}
+    for start, deltas in iter_deltas(coords, relative):
+        magnitude = np.linalg.norm(deltas, axis=2)                       # (k, V)
+        max_delta[start:start + len(deltas)] = magnitude.max(axis=1)
+        if epsilon > 0:
+            for k in np.flatnonzero(((magnitude > 0) & (magnitude < epsilon)).any(axis=1)):
+                small[start + k] = np.flatnonzero((magnitude[k] > 0) & (magnitude[k] < epsilon))
+
+    removable = {names[k] for k in np.flatnonzero(max_delta < threshold)} - {reference.name}
+    removable -= {name for name in removable if key_blocks[name].relative_key == key_blocks[name]}
+
+    # 清零：以原坐标为准把微小位移的顶点还原为 relative_key 坐标
+    zeroed, rewritten = 0, 0
+    for k, vertex_ids in small.items():
+        if names[k] in removable:
+            continue
+        co = np.array(coords[k])
+        co[vertex_ids] = coords[relative[k]][vertex_ids]
+        key_blocks[names[k]].data.foreach_set('co', co.reshape(-1))
+        zeroed += len(vertex_ids)
+        rewritten += 1
+
+    # 删除前把依赖关系改接到最近的保留祖先
+    def kept_ancestor(kb):
+        while kb.name in removable and kb.relative_key != kb:
+            kb = kb.relative_key
+        return kb
+
+    for kb in key_blocks:
+        if kb.name not in removable and kb.relative_key.name in removable:
+            kb.relative_key = kept_ancestor(kb.relative_key)
+
+    active_name = obj.active_shape_key.name if obj.active_shape_key else None
+    removed = [name for name in names if name in removable]
+    for name in reversed(removed):
+        obj.shape_key_remove(key_blocks[name])
+    if active_name in key_blocks:
+        obj.active_shape_key_index = key_blocks.find(active_name)
+    mesh.update()
+
+    return {
+        'removed': removed,
+        'zeroed': zeroed,
+        'rewritten': rewritten,
+        'bytes_saved': len(removed) * len(mesh.vertices) * 3 * 4,
+    }
+
+########################## Divider ##########################
+
+def split_shape_keys(obj: bpy.types.Object,
+                     names: List[str],
+                     left_weights: np.ndarray,
+                     left_suffix: str = "_L",
+                     right_suffix: str = "_R",
+                     remove_original: bool = False) -> List[Tuple[str, str, str]]:
+    """把形态键按左右权重拆分为两个形态键
+
+    位移 (k, V, 3) 与 (1, V, 1) 的左侧权重及其补数做一次广播乘法，加回 relative_key 坐标后
+    用 foreach_set 写入"名称+后缀"的形态键（已存在时覆盖），左右两半之和等于原形态键。
+    新形态键继承原形态键的 relative_key、滑块范围与顶点组。返回 [(原名称, 左名称, 右名称)]
+    """
+    if obj.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法拆分形态键，请先切换到物体模式")
+
+    mesh = obj.data
+    key_blocks = mesh.shape_keys.key_blocks
+    reference = mesh.shape_keys.reference_key
+    names = [name for name in names if name in key_blocks and name != reference.name]
+    if not names:
+        return []
+
+    # 原形态键与各自的 relative_key 一起提取，relative 索引在同一数组内
+    relative_names = [key_blocks[name].relative_key.name for name in names]
+    all_names = list(dict.fromkeys(names + relative_names))
+    coords, _ = extract_shape_keys(mesh, all_names)
+    relative = relative_key_indices(mesh, all_names)
+    sides = np.stack([left_weights, 1.0 - left_weights]).astype(np.float32)[:, None, :, None]   # (2, 1, V, 1)
+
+    split = []
+    for start, deltas in iter_deltas(coords, relative):
+        if start >= len(names):
+            break
+        deltas = deltas[:len(names) - start]
+        halves = deltas[None] * sides                                   # (2, k, V, 3)
+        for k in range(len(deltas)):
+            name = names[start + k]
+            source = key_blocks[name]
+            base = np.asarray(coords[relative[start + k]])
+            created = []
+            for half, suffix in zip(halves[:, k], (left_suffix, right_suffix)):
+                new_name = name + suffix
+                kb = key_blocks.get(new_name)
+                if kb is None:
+                    kb = obj.shape_key_add(name=new_name, from_mix=False)
+                kb.data.foreach_set('co', (base + half).reshape(-1))
+                kb.relative_key = source.relative_key
+                kb.vertex_group = source.vertex_group
+                set_slider_range(kb, source.slider_min, source.slider_max)
+                created.append(kb.name)
+            split.append((name, created[0], created[1]))
+
+    if remove_original:
+        for name, _, _ in split:
+            for kb in key_blocks:
+                if kb.relative_key.name == name and kb.name != name:
+                    kb.relative_key = key_blocks[name].relative_key
+            obj.shape_key_remove(key_blocks[name])
+    mesh.update()
+    return split
@@ -0,0 +1,138 @@
+# type: ignore
+import bpy
+import numpy as np
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+from typing import Tuple
+from .权重矩阵 import build_weight_matrix, limit_influences, write_dense_weights, VertexWeightMatrix
+from .镜像 import get_vertex_positions
+
+########################## Divider ##########################
+
+def world_positions(obj: bpy.types.Object) -> np.ndarray:
+    """物体顶点的世界坐标 (V, 3)"""
+    positions = get_vertex_positions(obj.data).astype(np.float64)
+    matrix = np.array(obj.matrix_world)
+    return positions @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def barycentric_weights(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """向量化计算点在三角形上的重心坐标
+
+    points (N, 3)，triangles (N, 3, 3)，返回 (N, 3)；退化三角形取第一个顶点
+    """
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    v0, v1, v2 = b - a, c - a, points - a
+    d00 = np.einsum('ij,ij->i', v0, v0)
+    d01 = np.einsum('ij,ij->i', v0, v1)
+    d11 = np.einsum('ij,ij->i', v1, v1)
+    d20 = np.einsum('ij,ij->i', v2, v0)
+    d21 = np.einsum('ij,ij->i', v2, v1)
+    denom = d00 * d11 - d01 * d01
+
+    bary = np.zeros((len(points), 3))
+    bary[:, 0] = 1.0
+    valid = np.abs(denom) > 1e-20
+    v = (d11[valid] * d20[valid] - d01[valid] * d21[valid]) / denom[valid]
+    w = (d00[valid] * d21[valid] - d01[valid] * d20[valid]) / denom[valid]
+    bary[valid] = np.stack([1.0 - v - w, v, w], axis=1)
+
+    # 最近点在三角形上，数值误差可能略出界
+    bary = np.clip(bary, 0.0, 1.0)
+    return bary / bary.sum(axis=1, keepdims=True)
+
+
+class SurfaceProjector:
+    """源网格表面的最近点投影：BVH树只构建一次，可复用于多个目标网格"""
+
+    def __init__(self, source: bpy.types.Object):
+        mesh = source.data
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get('vertices', triangles)
+
+        self.positions = world_positions(source)
+        self.triangles = triangles.reshape(-1, 3)
+        self.tree = BVHTree.FromPolygons(self.positions.tolist(), self.triangles.tolist())
+
+    def project(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """把点投影到最近的源表面
+
+        返回 ((N, 3) 三角形角点的源顶点索引, (N, 3) 重心坐标, (N,) 到表面的距离)，
+        找不到表面的点距离为inf
+        """
+        num_points = len(points)
+        tri_index = np.zeros(num_points, dtype=np.int64)
+        locations = np.array(points, dtype=np.float64)
+        distances = np.full(num_points, np.inf)
+        for i, co in enumerate(points):
+            location, _, index, dist = self.tree.find_nearest(Vector(co))
+            if index is not None:
+                tri_index[i] = index
+                locations[i] = location
+                distances[i] = dist
+
+        corners = self.triangles[tri_index]
+        return corners, barycentric_weights(locations, self.positions[corners]), distances
+
+
+class SurfaceWeightSampler(SurfaceProjector):
+    """源网格表面的权重采样器：BVH树与稠密权重只构建一次，可复用于多个目标网格"""
+
+    def __init__(self, source: bpy.types.Object):
+        super().__init__(source)
+        self.weight_matrix = build_weight_matrix(source)
+        self.group_names = self.weight_matrix.group_names
+        self.groups, self.weights = self.weight_matrix.to_dense()
+
+    def sample(self, points: np.ndarray) -> Tuple[VertexWeightMatrix, np.ndarray]:
+        """在最近表面点上按重心坐标插值权重
+
+        返回 (以源顶点组索引表示的 (N, G) 稀疏权重矩阵, (N,) 到表面的距离)
+        """
+        num_points = len(points)
+        corners, bary, distances = self.project(points)               # (N, 3), (N, 3), (N,)
+
+        # 三个角点的稠密权重按重心坐标加权后展开为 (顶点, 顶点组, 权重)
+        num_groups = len(self.group_names)
+        width = self.groups.shape[1]
+        corner_groups = self.groups[corners].reshape(num_points, 3 * width)
+        corner_weights = (self.weights[corners] * bary[:, :, None]).reshape(num_points, 3 * width)
+        mask = (corner_groups >= 0) & np.isfinite(distances)[:, None]
+        rows = np.nonzero(mask)[0].astype(np.int64)
+
+        # 散射累加：同一顶点组在不同角点上的贡献相加
+        keys, inverse = np.unique(rows * num_groups + corner_groups[mask], return_inverse=True)
+        data = np.bincount(inverse, weights=corner_weights[mask])
+        rows, groups = keys // num_groups, keys % num_groups
+
+        indptr = np.zeros(num_points + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_points), out=indptr[1:])
+        sampled = VertexWeightMatrix(indptr, groups.astype(np.int32), data.astype(np.float32), self.group_names)
+        return sampled, distances
+
+
+def transfer_weights(sampler: SurfaceWeightSampler,
+                     target: bpy.types.Object,
+                     max_influences: int = 4,
+                     epsilon: float = 0.0,
+                     normalize: bool = True) -> Tuple[int, float]:
+    """把源表面权重传递到目标网格（替换目标原有权重），返回 (有权重的顶点数量, 最大表面距离)"""
+    if target.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法传递权重，请先切换到物体模式")
+
+    sampled, distances = sampler.sample(world_positions(target))
+    groups, weights = sampled.to_dense()
+    groups, weights, _ = limit_influences(groups, weights, max_influences, epsilon, normalize)
+
+    # 源顶点组索引 → 目标顶点组索引（缺少的顶点组按源顺序新建）
+    vertex_groups = target.vertex_groups
+    for name in sampler.group_names:
+        if name not in vertex_groups:
+            vertex_groups.new(name=name)
+    index_map = np.array([vertex_groups[name].index for name in sampler.group_names] + [-1], dtype=np.int32)
+    groups = index_map[groups]
+
+    write_dense_weights(target, build_weight_matrix(target), groups, weights)
+    finite = distances[np.isfinite(distances)]
+    return int(np.count_nonzero((groups >= 0).any(axis=1))), float(finite.max()) if len(finite) else 0.0
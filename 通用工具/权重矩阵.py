@@ -0,0 +1,696 @@
+# type: ignore
+import bpy
+import numpy as np
+import hashlib
+from bpy.app.handlers import persistent
+from typing import Dict, List, Optional, Set, Tuple
+
+########################## Divider ##########################
+
+class VertexWeightMatrix:
+    """顶点×顶点组的稀疏权重矩阵（CSR格式）
+
+    indptr[v]:indptr[v+1] 为顶点 v 在 indices/data 中的区间，
+    indices 为顶点组索引，data 为对应权重
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, group_names: List[str]):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.group_names = list(group_names)
+        self._rows = None
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_groups(self) -> int:
+        return len(self.group_names)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """每个非零元素所属的顶点索引（与 indices/data 一一对应）"""
+        if self._rows is None:
+            self._rows = np.repeat(
+                np.arange(self.num_vertices, dtype=np.int32),
+                np.diff(self.indptr)
+            )
+        return self._rows
+
+    def group_member_counts(self) -> np.ndarray:
+        """每个顶点组包含的顶点数量（包括权重为0的成员）"""
+        return np.bincount(self.indices, minlength=self.num_groups)
+
+    def group_vertex_counts(self, min_weight: float = 0.0) -> np.ndarray:
+        """每个顶点组中权重大于 min_weight 的顶点数量"""
+        return np.bincount(self.indices[self.data > min_weight], minlength=self.num_groups)
+
+    def group_weight_sums(self) -> np.ndarray:
+        """每个顶点组的权重总和"""
+        return np.bincount(self.indices, weights=self.data, minlength=self.num_groups)
+
+    def group_has_weight(self) -> np.ndarray:
+        """每个顶点组是否至少有一个顶点权重大于0"""
+        return self.group_vertex_counts() > 0
+
+    def group_index(self, name: str) -> int:
+        """按名称获取顶点组索引，不存在时返回-1"""
+        try:
+            return self.group_names.index(name)
+        except ValueError:
+            return -1
+
+    def group_centroids(self, positions: np.ndarray, weighted: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """一次散射累加计算所有顶点组的中心
+
+        positions 为 (V, 3) 顶点坐标；weighted 为True时按权重加权平均，
+        否则对权重大于0的顶点取算术平均。
+        返回 (G, 3) 中心坐标与 (G,) 是否有效的掩码
+        """
+        mask = self.data > 0
+        groups = self.indices[mask]
+        rows = self.rows[mask]
+        weights = self.data[mask].astype(np.float64) if weighted else np.ones(len(groups))
+
+        denom = np.bincount(groups, weights=weights, minlength=self.num_groups)
+        centroids = np.zeros((self.num_groups, 3))
+        for axis in range(3):
+            centroids[:, axis] = np.bincount(
+                groups, weights=weights * positions[rows, axis], minlength=self.num_groups
+            )
+
+        valid = denom > 0
+        centroids[valid] /= denom[valid, None]
+        return centroids, valid
+
+    def group_descriptors(self, positions: np.ndarray, weighted: bool = True) -> Dict[str, np.ndarray]:
+        """一次向量化计算所有顶点组的空间描述符
+
+        返回字典（每项第一维为顶点组）:
+          centroid     (G, 3)    中心
+          covariance   (G, 3, 3) 协方差
+          axes         (G, 3, 3) 主轴（列向量，按方差从大到小）
+          spread       (G, 3)    主轴方向标准差
+          aabb_min     (G, 3)    包围盒最小点
+          aabb_max     (G, 3)    包围盒最大点
+          vertex_count (G,)      权重大于0的顶点数量
+          total_weight (G,)      权重总和
+          valid        (G,)      是否有权重
+        """
+        num_groups = self.num_groups
+        centroid, valid = self.group_centroids(positions, weighted)
+
+        mask = self.data > 0
+        groups = self.indices[mask]
+        rows = self.rows[mask]
+        weights = self.data[mask].astype(np.float64) if weighted else np.ones(len(groups))
+        denom = np.bincount(groups, weights=weights, minlength=num_groups)
+        denom[~valid] = 1.0
+
+        # 协方差：对6个独立分量分别散射累加
+        diff = positions[rows] - centroid[groups]
+        covariance = np.zeros((num_groups, 3, 3))
+        for a in range(3):
+            for b in range(a, 3):
+                value = np.bincount(groups, weights=weights * diff[:, a] * diff[:, b], minlength=num_groups) / denom
+                covariance[:, a, b] = value
+                covariance[:, b, a] = value
+
+        eigvals, axes = np.linalg.eigh(covariance)
+        spread = np.sqrt(np.maximum(eigvals[:, ::-1], 0.0))
+        axes = axes[:, :, ::-1]
+
+        aabb_min, aabb_max = self._group_aabb(positions, groups, rows)
+
+        return {
+            'centroid': centroid,
+            'covariance': covariance,
+            'axes': axes,
+            'spread': spread,
+            'aabb_min': aabb_min,
+            'aabb_max': aabb_max,
+            'vertex_count': np.bincount(groups, minlength=num_groups),
+            'total_weight': np.bincount(groups, weights=self.data[mask], minlength=num_groups),
+            'valid': valid,
+        }
+
+    def _group_aabb(self, positions: np.ndarray, groups: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """包围盒：按顶点组排序后分段归约，没有成员的顶点组为0"""
+        aabb_min = np.zeros((self.num_groups, 3))
+        aabb_max = np.zeros((self.num_groups, 3))
+        if len(groups):
+            order = np.argsort(groups, kind='stable')
+            sorted_groups = groups[order]
+            sorted_positions = positions[rows[order]]
+            starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+            present = sorted_groups[starts]
+            aabb_min[present] = np.minimum.reduceat(sorted_positions, starts, axis=0)
+            aabb_max[present] = np.maximum.reduceat(sorted_positions, starts, axis=0)
+        return aabb_min, aabb_max
+
+    def group_metrics(self, positions: np.ndarray) -> Dict[str, np.ndarray]:
+        """一次计算所有顶点组的统计：权重大于0的顶点数量、权重总和、最大权重与包围盒
+
+        positions 为 (V, 3) 顶点坐标（通常为世界坐标），包围盒只统计权重大于0的顶点
+        """
+        mask = self.data > 0
+        groups, rows = self.indices[mask], self.rows[mask]
+        max_weight = np.zeros(self.num_groups, dtype=np.float32)
+        np.maximum.at(max_weight, groups, self.data[mask])
+        aabb_min, aabb_max = self._group_aabb(positions, groups, rows)
+        return {
+            'count': np.bincount(groups, minlength=self.num_groups),
+            'sum': self.group_weight_sums(),
+            'max': max_weight,
+            'aabb_min': aabb_min,
+            'aabb_max': aabb_max,
+            'size': np.linalg.norm(aabb_max - aabb_min, axis=1),
+        }
+
+    def to_dense(self) -> Tuple[np.ndarray, np.ndarray]:
+        """转换为按顶点对齐的稠密表示
+
+        返回 (V, M) 顶点组索引（空位为-1）与 (V, M) 权重，M 为单个顶点的最大影响数
+        """
+        counts = np.diff(self.indptr)
+        width = int(counts.max()) if len(counts) else 0
+        groups = np.full((self.num_vertices, width), -1, dtype=np.int32)
+        weights = np.zeros((self.num_vertices, width), dtype=np.float32)
+        slots = np.arange(self.nnz) - np.repeat(self.indptr[:-1], counts)
+        groups[self.rows, slots] = self.indices
+        weights[self.rows, slots] = self.data
+        return groups, weights
+
+    def column(self, group_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """获取单个顶点组的 (顶点索引, 权重)"""
+        mask = self.indices == group_index
+        return self.rows[mask], self.data[mask]
+
+
+def build_weight_matrix(obj: bpy.types.Object) -> VertexWeightMatrix:
+    """一次遍历网格顶点，构建物体的稀疏权重矩阵"""
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+
+    vertices = obj.data.vertices
+    num_vertices = len(vertices)
+
+    # 每个顶点的顶点组数量 → 行指针
+    counts = np.fromiter((len(v.groups) for v in vertices), dtype=np.int64, count=num_vertices)
+    indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    # 展平所有 (顶点组索引, 权重)
+    nnz = int(indptr[-1])
+    pairs = np.fromiter(
+        (x for v in vertices for g in v.groups for x in (g.group, g.weight)),
+        dtype=np.float64,
+        count=nnz * 2
+    ).reshape(-1, 2)
+
+    return VertexWeightMatrix(
+        indptr,
+        pairs[:, 0].astype(np.int32),
+        pairs[:, 1].astype(np.float32),
+        [vg.name for vg in obj.vertex_groups]
+    )
+
+def add_weights_bucketed(vertex_group: bpy.types.VertexGroup,
+                         vertex_ids: np.ndarray,
+                         weights: np.ndarray,
+                         mode: str = 'REPLACE') -> int:
+    """按相同权重值分桶，每个桶调用一次 vertex_group.add，返回调用次数"""
+    if len(vertex_ids) == 0:
+        return 0
+    values, inverse = np.unique(np.asarray(weights, dtype=np.float32), return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+    buckets = np.split(np.asarray(vertex_ids)[order], starts[1:])
+    for value, ids in zip(values, buckets):
+        vertex_group.add(ids.tolist(), float(value), mode)
+    return len(values)
+
+
+def rebuild_vertex_groups(obj: bpy.types.Object, ordered_names: List[str]) -> VertexWeightMatrix:
+    """按给定名称顺序一次性重建物体的顶点组
+
+    已有顶点组保留权重与锁定状态，不存在的名称新建空组，
+    未列出的已有顶点组按原顺序追加在最后。返回重建前提取的权重矩阵
+    """
+    if obj.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法重建顶点组，请先切换到物体模式")
+
+    vertex_groups = obj.vertex_groups
+    weight_matrix = build_weight_matrix(obj)
+    old_index = {name: i for i, name in enumerate(weight_matrix.group_names)}
+    locks = [vg.lock_weight for vg in vertex_groups]
+    active_name = vertex_groups.active.name if vertex_groups.active else None
+
+    final_names = list(dict.fromkeys(ordered_names))
+    listed = set(final_names)
+    final_names += [name for name in weight_matrix.group_names if name not in listed]
+
+    # 按旧索引把非零元素分组，便于逐组写回
+    order = np.argsort(weight_matrix.indices, kind='stable')
+    sorted_groups = weight_matrix.indices[order]
+    bounds = np.searchsorted(sorted_groups, np.arange(weight_matrix.num_groups + 1))
+    rows = weight_matrix.rows[order]
+    data = weight_matrix.data[order]
+
+    vertex_groups.clear()
+    for name in final_names:
+        vg = vertex_groups.new(name=name)
+        if name not in old_index:
+            continue
+        i = old_index[name]
+        vg.lock_weight = locks[i]
+        add_weights_bucketed(vg, rows[bounds[i]:bounds[i + 1]], data[bounds[i]:bounds[i + 1]])
+
+    if active_name is not None:
+        vertex_groups.active_index = vertex_groups.find(active_name)
+
+    invalidate_weight_matrix(obj)
+    return weight_matrix
+
+def resolve_merge_map(mapping: Dict[str, str]) -> Dict[str, str]:
+    """展开链式映射（a→b, b→c 变为 a→c, b→c），出现循环时抛出异常"""
+    resolved = {}
+    for source in mapping:
+        target = mapping[source]
+        seen = {source}
+        while target in mapping and target != mapping[target]:
+            if target in seen:
+                raise ValueError(f"顶点组合并映射存在循环: {source}")
+            seen.add(target)
+            target = mapping[target]
+        if target != source:
+            resolved[source] = target
+    return resolved
+
+
+def merge_vertex_groups_batch(obj: bpy.types.Object,
+                              mapping: Dict[str, str],
+                              policy: str = 'CLAMP',
+                              remove_sources: bool = False) -> Dict[str, int]:
+    """一次性把多个源顶点组的权重合并到目标顶点组
+
+    mapping: {源顶点组: 目标顶点组}，支持链式映射
+    policy:
+      'ADD'       直接相加（写回时Blender仍会限制在0-1）
+      'CLAMP'     相加后限制到1
+      'NORMALIZE' 相加后把受影响顶点的所有权重归一化到总和为1（要求 remove_sources 为True，
+                  否则保留的源权重会使总和超过1）
+    返回 {目标顶点组: 写入的顶点数量}
+    """
+    if obj.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法合并顶点组，请先切换到物体模式")
+    if policy == 'NORMALIZE' and not remove_sources:
+        raise ValueError("NORMALIZE 策略需要同时删除源顶点组（remove_sources=True）")
+
+    vertex_groups = obj.vertex_groups
+    mapping = {src: dst for src, dst in resolve_merge_map(mapping).items() if src in vertex_groups}
+    if not mapping:
+        return {}
+    for target in set(mapping.values()):
+        if target not in vertex_groups:
+            vertex_groups.new(name=target)
+
+    # 只提取一次权重
+    weight_matrix = build_weight_matrix(obj)
+    num_groups = weight_matrix.num_groups
+    name_index = {name: i for i, name in enumerate(weight_matrix.group_names)}
+    group_map = np.arange(num_groups)
+    for source, target in mapping.items():
+        group_map[name_index[source]] = name_index[target]
+    is_source = group_map != np.arange(num_groups)
+
+    rows, groups, data = weight_matrix.rows, weight_matrix.indices, weight_matrix.data
+    affected = np.zeros(weight_matrix.num_vertices, dtype=bool)
+    affected[rows[is_source[groups]]] = True
+    entry_mask = affected[rows]
+
+    # 散射累加：以 (顶点, 合并后的顶点组) 为键求和
+    rows, groups, data = rows[entry_mask], group_map[groups[entry_mask]], data[entry_mask].astype(np.float64)
+    keys, inverse = np.unique(rows.astype(np.int64) * num_groups + groups, return_inverse=True)
+    merged = np.bincount(inverse, weights=data)
+    rows, groups = keys // num_groups, keys % num_groups
+
+    if policy == 'CLAMP':
+        merged = np.minimum(merged, 1.0)
+    elif policy == 'NORMALIZE':
+        totals = np.bincount(rows, weights=merged, minlength=weight_matrix.num_vertices)
+        merged = np.where(totals[rows] > 0, merged / np.maximum(totals[rows], 1e-12), merged)
+
+    # 写回：归一化会改动受影响顶点的所有顶点组，其余策略只写目标顶点组
+    target_indices = {name_index[target] for target in mapping.values()}
+    written = {}
+    order = np.argsort(groups, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(groups[order]) != 0])
+    for ids in np.split(order, starts[1:]):
+        group_index = int(groups[ids[0]])
+        if policy != 'NORMALIZE' and group_index not in target_indices:
+            continue
+        add_weights_bucketed(vertex_groups[group_index], rows[ids], merged[ids], 'REPLACE')
+        if group_index in target_indices:
+            written[weight_matrix.group_names[group_index]] = len(ids)
+
+    if remove_sources:
+        for source in mapping:
+            vertex_groups.remove(vertex_groups[source])
+
+    invalidate_weight_matrix(obj)
+    return written
+
+def limit_influences(groups: np.ndarray,
+                     weights: np.ndarray,
+                     max_influences: int = 4,
+                     epsilon: float = 0.0,
+                     normalize: bool = True,
+                     quantize: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """在稠密 (V, M) 表示上限制每个顶点的影响数量
+
+    依次执行：丢弃不大于 epsilon 的权重（顶点至少保留最大的一个）、保留最大的 max_influences 个、
+    归一化到总和为1、可选量化到8位（按最大余数分配，量化后总和仍为255/255）。
+    返回 (V, K) 顶点组索引（空位为-1）、(V, K) 权重、(V,) 是否有影响被裁剪
+    """
+    present = groups >= 0
+    keep = present & (weights > epsilon)
+
+    # 所有权重都低于阈值的顶点保留最大的一个，避免变为无权重
+    empty = present.any(axis=1) & ~keep.any(axis=1)
+    if empty.any():
+        strongest = np.argmax(np.where(present, weights, -np.inf), axis=1)
+        keep[np.flatnonzero(empty), strongest[empty]] = True
+
+    # 每行按权重降序取前K个
+    k = min(max_influences, groups.shape[1])
+    order = np.argsort(np.where(keep, -weights, np.inf), axis=1, kind='stable')[:, :k]
+    top_groups = np.take_along_axis(groups, order, axis=1)
+    top_weights = np.take_along_axis(weights, order, axis=1).astype(np.float64)
+    top_keep = np.take_along_axis(keep, order, axis=1)
+    top_groups[~top_keep] = -1
+    top_weights[~top_keep] = 0.0
+
+    if normalize:
+        totals = top_weights.sum(axis=1, keepdims=True)
+        np.divide(top_weights, totals, out=top_weights, where=totals > 0)
+
+    if quantize:
+        scaled = top_weights * 255.0
+        quantized = np.floor(scaled)
+        if normalize:
+            # 把舍去的余量按小数部分从大到小逐个补回
+            remainder = np.rint(scaled.sum(axis=1) - quantized.sum(axis=1)).astype(np.int64)
+            fraction_rank = np.argsort(np.argsort(-(scaled - quantized), axis=1, kind='stable'), axis=1)
+            quantized += (fraction_rank < remainder[:, None]) & top_keep
+        else:
+            quantized = np.rint(scaled)
+        top_weights = quantized / 255.0
+        # 量化为0的影响不再保留，否则导出时仍会占用影响槽位
+        top_groups[quantized == 0] = -1
+
+    clipped = present.sum(axis=1) > (top_groups >= 0).sum(axis=1)
+
+    return top_groups, top_weights.astype(np.float32), clipped
+
+
+def write_dense_weights(obj: bpy.types.Object,
+                        weight_matrix: VertexWeightMatrix,
+                        groups: np.ndarray,
+                        weights: np.ndarray) -> int:
+    """把稠密 (V, K) 权重写回物体，只改动与 weight_matrix 不同的条目
+
+    稠密表示中不再出现的 (顶点, 顶点组) 从顶点组移除，其余变化的权重按桶写回。
+    返回改动的顶点数量
+    """
+    num_groups = weight_matrix.num_groups
+    mask = groups >= 0
+    new_rows = np.nonzero(mask)[0].astype(np.int64)
+    new_groups = groups[mask].astype(np.int64)
+    new_weights = weights[mask]
+    new_keys = new_rows * num_groups + new_groups
+
+    old_keys = weight_matrix.rows.astype(np.int64) * num_groups + weight_matrix.indices
+    removed = ~np.isin(old_keys, new_keys)
+
+    # 旧矩阵中不存在的 (顶点, 顶点组) 视为变化（例如权重传递到无权重的网格）
+    changed = np.ones(len(new_keys), dtype=bool)
+    if len(old_keys):
+        lookup = np.argsort(old_keys)
+        position = lookup[np.minimum(np.searchsorted(old_keys, new_keys, sorter=lookup), len(old_keys) - 1)]
+        found = old_keys[position] == new_keys
+        changed[found] = weight_matrix.data[position[found]] != new_weights[found]
+
+    vertex_groups = obj.vertex_groups
+    removed_rows, removed_groups = weight_matrix.rows[removed], weight_matrix.indices[removed]
+    for group_index in np.unique(removed_groups):
+        vertex_groups[int(group_index)].remove(removed_rows[removed_groups == group_index].tolist())
+
+    changed_rows, changed_groups, changed_weights = new_rows[changed], new_groups[changed], new_weights[changed]
+    for group_index in np.unique(changed_groups):
+        select = changed_groups == group_index
+        add_weights_bucketed(vertex_groups[int(group_index)], changed_rows[select], changed_weights[select], 'REPLACE')
+
+    invalidate_weight_matrix(obj)
+    return len(np.union1d(removed_rows, changed_rows))
+
+
+def limit_vertex_influences(obj: bpy.types.Object,
+                            max_influences: int = 4,
+                            epsilon: float = 0.0,
+                            normalize: bool = True,
+                            quantize: bool = False) -> Tuple[int, int]:
+    """一次提取权重，限制物体每个顶点的影响数量并写回，返回 (被裁剪的顶点数量, 改动的顶点数量)"""
+    if obj.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法限制顶点影响数量，请先切换到物体模式")
+
+    weight_matrix = build_weight_matrix(obj)
+    if weight_matrix.nnz == 0:
+        return 0, 0
+    groups, weights = weight_matrix.to_dense()
+    groups, weights, clipped = limit_influences(groups, weights, max_influences, epsilon, normalize, quantize)
+    changed = write_dense_weights(obj, weight_matrix, groups, weights)
+    return int(clipped.sum()), changed
+
+def group_weight_hashes(weight_matrix: VertexWeightMatrix, step: float = 0.001) -> List[str]:
+    """每个顶点组稀疏权重向量的哈希
+
+    权重按 step 量化，量化后为0的成员忽略，因此差异小于量化精度的顶点组得到相同哈希
+    """
+    quantized = np.rint(weight_matrix.data / max(step, 1e-9)).astype(np.int64)
+    keep = quantized != 0
+    groups, rows, quantized = weight_matrix.indices[keep], weight_matrix.rows[keep], quantized[keep]
+
+    # 按顶点组稳定排序，组内保持顶点索引升序
+    order = np.argsort(groups, kind='stable')
+    bounds = np.searchsorted(groups[order], np.arange(weight_matrix.num_groups + 1))
+    rows, quantized = rows[order].astype(np.int64), quantized[order]
+
+    hashes = []
+    for i in range(weight_matrix.num_groups):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(rows[bounds[i]:bounds[i + 1]].tobytes())
+        digest.update(quantized[bounds[i]:bounds[i + 1]].tobytes())
+        hashes.append(digest.hexdigest())
+    return hashes
+
+
+def find_duplicate_groups(weight_matrix: VertexWeightMatrix, step: float = 0.001) -> List[List[int]]:
+    """找出权重相同（量化后）的顶点组，返回每组重复的顶点组索引列表，忽略空顶点组"""
+    buckets = {}
+    has_weight = weight_matrix.group_vertex_counts(step * 0.5) > 0
+    for index, key in enumerate(group_weight_hashes(weight_matrix, step)):
+        if has_weight[index]:
+            buckets.setdefault(key, []).append(index)
+    return [indices for indices in buckets.values() if len(indices) > 1]
+
+
+def diff_weight_matrices(matrix_a: VertexWeightMatrix,
+                         matrix_b: VertexWeightMatrix,
+                         tolerance: float = 0.001) -> Dict[str, Tuple[float, float, int, int]]:
+    """逐顶点组比较两个顶点数量相同的网格的权重
+
+    按名称对齐顶点组，一次散射累加得到所有 (顶点, 顶点组) 的差值。
+    返回 {顶点组名称: (最大差值, 平均差值, 差值超过容差的顶点数量, 任一侧有成员的顶点数量)}，
+    只存在于一侧的顶点组同样参与比较（另一侧视为0）
+    """
+    if matrix_a.num_vertices != matrix_b.num_vertices:
+        raise ValueError("两个网格的顶点数量不同，无法逐顶点比较权重")
+
+    names = list(dict.fromkeys(matrix_a.group_names + matrix_b.group_names))
+    name_index = {name: i for i, name in enumerate(names)}
+    map_a = np.array([name_index[name] for name in matrix_a.group_names], dtype=np.int64)
+    map_b = np.array([name_index[name] for name in matrix_b.group_names], dtype=np.int64)
+    num_groups = len(names)
+
+    keys = np.concatenate([
+        matrix_a.rows.astype(np.int64) * num_groups + map_a[matrix_a.indices],
+        matrix_b.rows.astype(np.int64) * num_groups + map_b[matrix_b.indices],
+    ])
+    values = np.concatenate([matrix_a.data.astype(np.float64), -matrix_b.data.astype(np.float64)])
+    keys, inverse = np.unique(keys, return_inverse=True)
+    delta = np.abs(np.bincount(inverse, weights=values))
+    groups = keys % num_groups
+
+    touched = np.bincount(groups, minlength=num_groups)
+    max_delta = np.zeros(num_groups)
+    np.maximum.at(max_delta, groups, delta)
+    mean_delta = np.bincount(groups, weights=delta, minlength=num_groups) / np.maximum(touched, 1)
+    changed = np.bincount(groups[delta > tolerance], minlength=num_groups)
+
+    return {name: (float(max_delta[i]), float(mean_delta[i]), int(changed[i]), int(touched[i]))
+            for i, name in enumerate(names)}
+
+########################## Divider ##########################
+
+# 网格指针 → (签名, 权重矩阵)
+_matrix_cache: Dict[int, Tuple[tuple, VertexWeightMatrix]] = {}
+
+# 只重命名了顶点组的网格指针：下一次依赖图更新不清除其缓存
+_renamed_meshes: Set[int] = set()
+
+
+def _mesh_signature(obj: bpy.types.Object) -> tuple:
+    """网格的廉价签名：顶点数量与顶点组的指针顺序
+
+    重命名不改变顶点组指针，因此不会使缓存失效；增删或重排顶点组会改变签名
+    """
+    return (len(obj.data.vertices), tuple(vg.as_pointer() for vg in obj.vertex_groups))
+
+
+def _cached_weight_matrix(obj: bpy.types.Object) -> Optional[VertexWeightMatrix]:
+    """签名一致时返回缓存的权重矩阵，并同步重命名后的顶点组名称"""
+    cached = _matrix_cache.get(obj.data.as_pointer())
+    if not cached or cached[0] != _mesh_signature(obj):
+        return None
+    matrix = cached[1]
+    names = [vg.name for vg in obj.vertex_groups]
+    if matrix.group_names != names:
+        matrix.group_names = names
+    return matrix
+
+
+def get_weight_matrix(obj: bpy.types.Object, use_cache: bool = True) -> VertexWeightMatrix:
+    """获取物体的权重矩阵，网格未变化时复用上次构建的结果"""
+    if not use_cache or obj.mode == 'EDIT':
+        return build_weight_matrix(obj)
+
+    matrix = _cached_weight_matrix(obj)
+    if matrix is None:
+        matrix = build_weight_matrix(obj)
+        _matrix_cache[obj.data.as_pointer()] = (_mesh_signature(obj), matrix)
+    return matrix
+
+
+def peek_weight_matrix(obj: bpy.types.Object) -> Optional[VertexWeightMatrix]:
+    """只读取缓存中仍然有效的权重矩阵，不触发构建（适合在绘制回调中使用）"""
+    return _cached_weight_matrix(obj)
+
+
+def note_vertex_group_renames(obj: bpy.types.Object) -> None:
+    """标记物体只重命名了顶点组（权重未变），重命名触发的几何更新不会清除权重矩阵缓存"""
+    if obj.data.as_pointer() in _matrix_cache:
+        _renamed_meshes.add(obj.data.as_pointer())
+
+
+def invalidate_weight_matrix(obj: Optional[bpy.types.Object] = None) -> None:
+    """使物体的权重矩阵缓存失效，不传入物体时清空全部缓存"""
+    if obj is None:
+        _matrix_cache.clear()
+    elif obj.type == 'MESH':
+        _matrix_cache.pop(obj.data.as_pointer(), None)
+
+
+########################## Divider ##########################
+
+# 描述符缓存保存在物体自定义属性中，随文件保存
+DESCRIPTOR_CACHE_PROP = "xbone_vg_descriptors"
+
+
+def content_hash(positions: np.ndarray, weight_matrix: VertexWeightMatrix, *extra) -> str:
+    """顶点坐标与顶点组成员/权重的内容哈希（不含顶点组名称，重命名后仍然命中）"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(positions, dtype=np.float64).tobytes())
+    digest.update(weight_matrix.indptr.tobytes())
+    digest.update(weight_matrix.indices.tobytes())
+    digest.update(weight_matrix.data.tobytes())
+    for item in extra:
+        digest.update(repr(item).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_group_descriptors(obj: bpy.types.Object,
+                          positions: np.ndarray,
+                          weighted: bool = True,
+                          use_cache: bool = True) -> Tuple[Dict[str, np.ndarray], bool]:
+    """获取顶点组描述符，网格内容未变化时直接读取物体上缓存的结果
+
+    positions 为参与计算的顶点坐标（通常为世界坐标）。
+    返回 (描述符字典, 是否命中缓存)
+    """
+    weight_matrix = get_weight_matrix(obj)
+    key = content_hash(positions, weight_matrix, weighted)
+
+    cached = obj.get(DESCRIPTOR_CACHE_PROP) if use_cache else None
+    if cached is not None and cached.get("hash") == key:
+        # 描述符按顶点组索引排列，重命名只需更新记录的名称
+        if list(cached.get("names", [])) != weight_matrix.group_names:
+            cached["names"] = weight_matrix.group_names
+        arrays = cached["arrays"]
+        return {name: np.array(arrays[name], dtype=np.float64).reshape(tuple(cached["shapes"][name]))
+                for name in arrays.keys()}, True
+
+    descriptors = weight_matrix.group_descriptors(positions, weighted)
+    if use_cache:
+        obj[DESCRIPTOR_CACHE_PROP] = {
+            "hash": key,
+            "names": weight_matrix.group_names,
+            "arrays": {name: value.astype(np.float64).ravel().tolist() for name, value in descriptors.items()},
+            "shapes": {name: list(value.shape) for name, value in descriptors.items()},
+        }
+    return descriptors, False
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    """网格几何（包括权重）变化时清除对应缓存"""
+    renamed = set(_renamed_meshes)
+    _renamed_meshes.clear()
+    if not _matrix_cache:
+        return
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object):
+            if id_data.type != 'MESH':
+                continue
+            id_data = id_data.data
+        # 只重命名了顶点组的网格权重未变，保留缓存
+        if isinstance(id_data, bpy.types.Mesh) and id_data.as_pointer() not in renamed:
+            _matrix_cache.pop(id_data.as_pointer(), None)
+
+
+@persistent
+def _on_load_post(*args):
+    _matrix_cache.clear()
+    _renamed_meshes.clear()
+
+########################## Divider ##########################
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    _matrix_cache.clear()
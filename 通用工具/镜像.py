@@ -0,0 +1,208 @@
+# type: ignore
+import bpy
+import numpy as np
+import hashlib
+from mathutils.kdtree import KDTree
+from typing import Dict, List, Optional, Tuple
+from .权重矩阵 import get_weight_matrix, add_weights_bucketed, invalidate_weight_matrix
+
+# 默认的左右名称模式，逗号分隔，每项为 "左:右"
+DEFAULT_MIRROR_PATTERNS = "_L:_R, .L:.R, _l:_r, .l:.r, Left:Right, left:right, 左:右"
+
+########################## Divider ##########################
+
+def get_vertex_positions(mesh: bpy.types.Mesh) -> np.ndarray:
+    """一次读取网格的局部顶点坐标 (V, 3)"""
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', positions)
+    return positions.reshape(-1, 3)
+
+
+def build_symmetry_map(positions: np.ndarray, tolerance: float = 0.001, axis: int = 0) -> np.ndarray:
+    """用KD树建立沿指定轴的顶点对称映射
+
+    返回 (V,) 数组，mirror[i] 为顶点 i 的对称顶点索引，容差内找不到时为-1。
+    位于对称面上的顶点映射到自身
+    """
+    tree = KDTree(len(positions))
+    for i, co in enumerate(positions):
+        tree.insert(co, i)
+    tree.balance()
+
+    mirrored = np.array(positions, dtype=np.float64)
+    mirrored[:, axis] *= -1.0
+    mirror = np.full(len(positions), -1, dtype=np.int64)
+    for i, co in enumerate(mirrored):
+        _, j, dist = tree.find(co)
+        if j is not None and dist <= tolerance:
+            mirror[i] = j
+    return mirror
+
+
+# 网格指针 → (坐标哈希, 对称映射)
+_symmetry_cache: Dict[int, Tuple[str, np.ndarray]] = {}
+
+
+def get_symmetry_map(obj: bpy.types.Object, tolerance: float = 0.001, axis: int = 0) -> Tuple[np.ndarray, bool]:
+    """获取物体的对称映射，顶点坐标未变化时复用缓存，返回 (对称映射, 是否命中缓存)"""
+    positions = get_vertex_positions(obj.data)
+    digest = hashlib.blake2b(positions.tobytes(), digest_size=16)
+    digest.update(repr((tolerance, axis)).encode())
+    key = digest.hexdigest()
+
+    pointer = obj.data.as_pointer()
+    cached = _symmetry_cache.get(pointer)
+    if cached and cached[0] == key:
+        return cached[1], True
+
+    mirror = build_symmetry_map(positions, tolerance, axis)
+    _symmetry_cache[pointer] = (key, mirror)
+    return mirror, False
+
+
+# 网格指针 → (坐标哈希, 左侧权重)
+_side_weight_cache: Dict[int, Tuple[str, np.ndarray]] = {}
+
+
+def build_side_weights(positions: np.ndarray, band: float = 0.0, axis: int = 0) -> np.ndarray:
+    """按坐标符号计算每个顶点属于左侧（+X）的权重 (V,)，右侧权重为 1 - 左侧权重
+
+    band > 0 时在 [-band/2, band/2] 范围内用 smoothstep 平滑过渡，否则为硬切分（对称面上为0.5）
+    """
+    coordinate = positions[:, axis].astype(np.float64)
+    if band > 0:
+        t = np.clip(coordinate / band + 0.5, 0.0, 1.0)
+        weights = t * t * (3.0 - 2.0 * t)
+    else:
+        weights = np.where(coordinate > 0, 1.0, np.where(coordinate < 0, 0.0, 0.5))
+    return weights.astype(np.float32)
+
+
+def get_side_weights(obj: bpy.types.Object, band: float = 0.0, axis: int = 0) -> Tuple[np.ndarray, bool]:
+    """获取物体的左侧权重，顶点坐标未变化时复用缓存，返回 (左侧权重, 是否命中缓存)"""
+    positions = get_vertex_positions(obj.data)
+    digest = hashlib.blake2b(positions.tobytes(), digest_size=16)
+    digest.update(repr((band, axis)).encode())
+    key = digest.hexdigest()
+
+    pointer = obj.data.as_pointer()
+    cached = _side_weight_cache.get(pointer)
+    if cached and cached[0] == key:
+        return cached[1], True
+
+    weights = build_side_weights(positions, band, axis)
+    _side_weight_cache[pointer] = (key, weights)
+    return weights, False
+
+
+def clear_symmetry_cache() -> None:
+    _symmetry_cache.clear()
+    _side_weight_cache.clear()
+
+########################## Divider ##########################
+
+def parse_mirror_patterns(text: str) -> List[Tuple[str, str]]:
+    """解析 "左:右, 左:右" 形式的名称模式"""
+    patterns = []
+    for item in text.split(','):
+        if ':' not in item:
+            continue
+        left, right = (part.strip() for part in item.split(':', 1))
+        if left and right and left != right:
+            patterns.append((left, right))
+    return patterns
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+def _suffix_boundary(name: str, token: str) -> bool:
+    """后缀前是否为词边界：分隔符、数字，或驼峰（大写开头的后缀接在小写字母后）"""
+    if not _is_word_char(token[0]):
+        return True
+    before = name[-len(token) - 1]
+    return not _is_word_char(before) or before.isdigit() or (token[0].isupper() and before.islower())
+
+
+def _prefix_boundary(name: str, token: str) -> bool:
+    """前缀后是否为词边界：分隔符、数字或大写字母（驼峰），避免 "_Lips"、"Leftover" 被当作左侧名称"""
+    if not _is_word_char(token[-1]):
+        return True
+    after = name[len(token)]
+    return not _is_word_char(after) or after.isdigit() or after.isupper()
+
+
+def mirror_name(name: str, patterns: List[Tuple[str, str]], direction: str = 'L2R') -> Optional[str]:
+    """按模式把名称从一侧换到另一侧（匹配前缀或后缀），不属于源侧时返回None
+
+    前缀与后缀都必须落在词边界上（见 _prefix_boundary / _suffix_boundary）
+    """
+    for left, right in patterns:
+        source, target = (left, right) if direction == 'L2R' else (right, left)
+        if name == source:
+            return target
+        if len(name) < len(source):
+            continue
+        if name.endswith(source) and _suffix_boundary(name, source):
+            return name[:-len(source)] + target
+        if name.startswith(source) and _prefix_boundary(name, source):
+            return target + name[len(source):]
+    return None
+
+
+def resolve_mirror_pairs(names: List[str], patterns: List[Tuple[str, str]], direction: str = 'L2R') -> Dict[str, str]:
+    """为源侧的每个名称求出对侧名称，返回 {源: 目标}"""
+    pairs = {}
+    for name in names:
+        other = mirror_name(name, patterns, direction)
+        if other and other != name:
+            pairs[name] = other
+    return pairs
+
+
+def mirror_vertex_groups(obj: bpy.types.Object, pairs: Dict[str, str], mirror: np.ndarray) -> Dict[str, int]:
+    """按对称映射把源顶点组的权重镜像到目标顶点组
+
+    目标权重 = 源权重[mirror]，为一次NumPy gather；没有对称顶点的顶点保持原样。
+    目标顶点组不存在时新建，返回 {目标顶点组: 写入的顶点数量}
+    """
+    if obj.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法镜像顶点组，请先切换到物体模式")
+
+    vertex_groups = obj.vertex_groups
+    pairs = {src: dst for src, dst in pairs.items() if src in vertex_groups}
+    for target in pairs.values():
+        if target not in vertex_groups:
+            vertex_groups.new(name=target)
+
+    weight_matrix = get_weight_matrix(obj, use_cache=False)
+    num_vertices = weight_matrix.num_vertices
+    has_mirror = mirror >= 0
+    mirror_safe = np.where(has_mirror, mirror, 0)
+
+    written = {}
+    for source, target in pairs.items():
+        source_weights = np.zeros(num_vertices, dtype=np.float32)
+        source_members = np.zeros(num_vertices, dtype=bool)
+        rows, data = weight_matrix.column(weight_matrix.group_index(source))
+        source_weights[rows] = data
+        source_members[rows] = True
+
+        target_rows, _ = weight_matrix.column(weight_matrix.group_index(target))
+        target_members = np.zeros(num_vertices, dtype=bool)
+        target_members[target_rows] = True
+
+        # gather：每个有对称顶点的顶点取对侧源权重
+        gathered = source_weights[mirror_safe]
+        assign = has_mirror & source_members[mirror_safe]
+        clear = has_mirror & ~assign & target_members
+
+        vg = vertex_groups[target]
+        if clear.any():
+            vg.remove(np.flatnonzero(clear).tolist())
+        add_weights_bucketed(vg, np.flatnonzero(assign), gathered[assign], 'REPLACE')
+        written[target] = int(np.count_nonzero(assign))
+
+    invalidate_weight_matrix(obj)
+    return written
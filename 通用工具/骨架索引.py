@@ -0,0 +1,93 @@
+# type: ignore
+import bpy
+from bpy.app.handlers import persistent
+from typing import Dict, List, Optional, Tuple
+
+########################## Divider ##########################
+
+# 场景指针 → {骨架 session_uid: [(网格名称, 网格 session_uid)]}
+# 骨架按 session_uid 索引，重命名后仍能命中；网格名称解析失败时重建索引
+_armature_index: Dict[int, Dict[int, List[Tuple[str, int]]]] = {}
+
+
+def _build_index(scene: bpy.types.Scene) -> Dict[int, List[Tuple[str, int]]]:
+    """遍历一次场景，记录每个骨架被哪些网格的骨架修改器引用"""
+    index = {}
+    for obj in scene.objects:
+        if obj.type != 'MESH':
+            continue
+        for modifier in obj.modifiers:
+            if modifier.type == 'ARMATURE' and modifier.object:
+                entries = index.setdefault(modifier.object.session_uid, [])
+                entry = (obj.name, obj.session_uid)
+                if entry not in entries:
+                    entries.append(entry)
+    return index
+
+
+def _resolve_meshes(scene: bpy.types.Scene,
+                    entries: List[Tuple[str, int]],
+                    armature: bpy.types.Object) -> Optional[List[bpy.types.Object]]:
+    """按名称取回索引中的网格，任一名称已失效（物体被重命名或删除）时返回None"""
+    meshes = []
+    for name, uid in entries:
+        obj = scene.objects.get(name)
+        if obj is None or obj.session_uid != uid:
+            return None
+        # 防御性检查：索引失效前修改器可能已被修改
+        if any(m.type == 'ARMATURE' and m.object == armature for m in obj.modifiers):
+            meshes.append(obj)
+    return meshes
+
+
+def get_deformed_meshes(armature: bpy.types.Object, scene: Optional[bpy.types.Scene] = None) -> List[bpy.types.Object]:
+    """获取场景中带有指向该骨架的骨架修改器的所有网格物体"""
+    scene = scene or bpy.context.scene
+    key = scene.as_pointer()
+    index = _armature_index.get(key)
+    if index is None:
+        index = _armature_index[key] = _build_index(scene)
+
+    meshes = _resolve_meshes(scene, index.get(armature.session_uid, []), armature)
+    if meshes is None:
+        # 重命名不一定触发依赖图更新，名称失效时重建索引后重试
+        index = _armature_index[key] = _build_index(scene)
+        meshes = _resolve_meshes(scene, index.get(armature.session_uid, []), armature) or []
+    return meshes
+
+
+def invalidate_armature_index() -> None:
+    _armature_index.clear()
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    """物体增删、修改器变化或重命名时使索引失效"""
+    if not _armature_index:
+        return
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, (bpy.types.Scene, bpy.types.Collection)):
+            invalidate_armature_index()
+            return
+        if isinstance(id_data, bpy.types.Object) and id_data.type == 'MESH' and update.is_updated_geometry:
+            invalidate_armature_index()
+            return
+
+
+@persistent
+def _on_load_post(*args):
+    invalidate_armature_index()
+
+########################## Divider ##########################
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    invalidate_armature_index()
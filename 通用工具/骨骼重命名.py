@@ -0,0 +1,114 @@
+# type: ignore
+import bpy
+from typing import Dict, Iterable, List, Tuple
+from .匹配算法 import apply_renames
+
+########################## Divider ##########################
+
+def find_rename_cycles(rename_map: Dict[str, str]) -> List[List[str]]:
+    """找出重命名映射中的循环（如 a→b, b→a），两阶段重命名可以正确处理这些循环"""
+    cycles = []
+    visited = set()
+    for start in rename_map:
+        if start in visited:
+            continue
+        path = []
+        name = start
+        while name in rename_map and name not in visited:
+            visited.add(name)
+            path.append(name)
+            name = rename_map[name]
+        if name in path:
+            cycles.append(path[path.index(name):])
+    return cycles
+
+
+def validate_bone_rename_map(armature: bpy.types.Object,
+                             mapping: Dict[str, str],
+                             meshes: Iterable[bpy.types.Object] = ()) -> Tuple[Dict[str, str], List[str], List[str], List[List[str]]]:
+    """在修改任何数据之前检查完整的 旧名称→新名称 映射
+
+    返回 (有效映射, 不存在的骨骼, 冲突说明, 循环)：
+      - 新旧相同或源骨骼不存在的条目被剔除
+      - 多个骨骼改为同一名称、或目标名称被未参与重命名的骨骼/顶点组占用，视为冲突
+    """
+    bones = armature.data.bones
+    rename_map = {}
+    missing = []
+    for old, new in mapping.items():
+        if old == new:
+            continue
+        if old not in bones:
+            missing.append(old)
+            continue
+        rename_map[old] = new
+
+    collisions = []
+    sources = {}
+    for old, new in rename_map.items():
+        sources.setdefault(new, []).append(old)
+    for new, olds in sources.items():
+        if len(olds) > 1:
+            collisions.append(f"{', '.join(olds)} → {new}")
+
+    # 目标名称被保留下来的骨骼或顶点组占用
+    for old, new in rename_map.items():
+        if new in bones and new not in rename_map:
+            collisions.append(f"{old} → {new}（骨骼已存在）")
+        for obj in meshes:
+            if new in obj.vertex_groups and new not in rename_map and new not in bones:
+                collisions.append(f"{old} → {new}（{obj.name} 中顶点组已存在）")
+
+    return rename_map, missing, collisions, find_rename_cycles(rename_map)
+
+
+def apply_bone_renames(armature: bpy.types.Object,
+                       rename_map: Dict[str, str],
+                       meshes: Iterable[bpy.types.Object] = ()) -> Dict[str, int]:
+    """两阶段批量重命名骨骼，并在同一批次中同步绑定网格的顶点组
+
+    Blender 只会为骨架修改器指向该骨架的网格自动重命名顶点组，
+    这里按重命名前的顶点组快照补齐其余网格，返回 {'bones': 数量, 'vertex_groups': 数量}
+    """
+    if armature.mode == 'EDIT':
+        raise RuntimeError("编辑模式下无法批量重命名骨骼，请先切换到姿态或物体模式")
+
+    # 快照：记录每个网格中需要跟随重命名的顶点组对象
+    snapshots = []
+    for obj in meshes:
+        snapshots.append((obj, [(vg, rename_map[vg.name]) for vg in obj.vertex_groups if vg.name in rename_map]))
+
+    renamed_bones = apply_renames(armature.data.bones, rename_map)
+
+    renamed_groups = 0
+    for obj, groups in snapshots:
+        pending = {vg.name: new for vg, new in groups if vg.name != new}
+        apply_renames(obj.vertex_groups, pending)
+        renamed_groups += len(groups)
+
+    return {'bones': renamed_bones, 'vertex_groups': renamed_groups}
+
+
+def bulk_rename_bones(operator: bpy.types.Operator,
+                      armature: bpy.types.Object,
+                      mapping: Dict[str, str],
+                      meshes: Iterable[bpy.types.Object] = ()) -> bool:
+    """校验并执行批量重命名，输出一次汇总；存在冲突时不做任何修改并返回False"""
+    meshes = list(meshes)
+    rename_map, missing, collisions, cycles = validate_bone_rename_map(armature, mapping, meshes)
+
+    if collisions:
+        print("骨骼重命名冲突：")
+        for collision in collisions:
+            print(f"  {collision}")
+        operator.report({'ERROR'}, f"存在{len(collisions)}处名称冲突，未做修改（详见控制台）")
+        return False
+
+    summary = apply_bone_renames(armature, rename_map, meshes)
+
+    print(f"骨骼重命名：{summary['bones']}根骨骼，{len(meshes)}个网格中{summary['vertex_groups']}个顶点组")
+    if cycles:
+        print(f"  其中{len(cycles)}组循环重命名：" + "；".join(" → ".join(cycle + cycle[:1]) for cycle in cycles))
+    if missing:
+        print(f"  {len(missing)}根骨骼不存在：{', '.join(missing)}")
+    return True
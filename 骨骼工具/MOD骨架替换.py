@@ -3,6 +3,9 @@ import bpy
 import os
 import csv, json
 from bpy_extras.io_utils import ImportHelper
+from ..通用工具.骨架索引 import get_deformed_meshes
+from ..通用工具.骨骼重命名 import bulk_rename_bones
+from ..通用工具.权重传递 import SurfaceWeightSampler, transfer_weights
 
 class ObjType(bpy.types.Operator):
     def is_mesh(scene, obj):
@@ -461,18 +464,77 @@ class O_only_BoneRenameMapping(bpy.types.Operator):
             value = str(row[change_skel_column])
             if (key == "None") or (value == "None"):
                 continue
-            O_only_BoneRenameMapping.bone_mapping[key] = value
+            bone_mapping[key] = value
 
-        # 姿态模式重命名
+        # 姿态模式下校验完整映射后一次批量重命名，绑定网格的顶点组同步重命名
         bpy.ops.object.mode_set(mode='OBJECT')
         bpy.context.view_layer.objects.active = TargetArmature
         bpy.ops.object.mode_set(mode='POSE')
-        for current_bone_name, change_bone_name in bone_mapping.items():
-            try:
-                TargetArmature.data.bones[current_bone_name].name = change_bone_name
-            except:
-                print(f"{current_bone_name}不存在")
+        if not bulk_rename_bones(self, TargetArmature, bone_mapping, get_deformed_meshes(TargetArmature, context.scene)):
+            return {'CANCELLED'}
 
+        self.report({'INFO'}, "已按csv重命名骨骼！")
+        return {'FINISHED'}
+
+class O_TransferWeights(bpy.types.Operator):
+    bl_idname = "xbone.transfer_weights"
+    bl_label = "传递权重"
+    bl_description = "从源物体最近的表面按重心坐标插值，把权重传递到所有选择的网格（替换原有权重）"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_influences: bpy.props.IntProperty(
+        name="最大影响数",
+        description="每个顶点最多保留的顶点组数量",
+        default=4,
+        min=1,
+        max=32
+    )
+    epsilon: bpy.props.FloatProperty(
+        name="最小权重",
+        description="不大于该值的插值权重会被丢弃",
+        default=0.001,
+        min=0.0,
+        max=1.0,
+        precision=4
+    )
+    normalize: bpy.props.BoolProperty(
+        name="归一化",
+        default=True
+    )
+    bind_armature: bpy.props.BoolProperty(
+        name="绑定骨架",
+        description="目标没有骨架修改器时，添加指向源物体骨架的骨架修改器",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=200)
+
+    def execute(self, context):
+        source = context.scene.transfer_source_mesh
+        if not source:
+            self.report({'ERROR'}, "似乎没有选择源物体")
+            return {'FINISHED'}
+        targets = [obj for obj in context.selected_objects if obj.type == 'MESH' and obj != source]
+        if not targets:
+            self.report({'ERROR'}, "请选择要传递权重的网格物体")
+            return {'FINISHED'}
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        # 源物体的BVH树与权重只构建一次，所有目标复用
+        sampler = SurfaceWeightSampler(source)
+        source_armature = source.find_armature()
+        for target in targets:
+            weighted, max_distance = transfer_weights(
+                sampler, target, self.max_influences, self.epsilon, self.normalize)
+            if self.bind_armature and source_armature and not any(m.type == 'ARMATURE' for m in target.modifiers):
+                modifier = target.modifiers.new(name="Armature", type='ARMATURE')
+                modifier.object = source_armature
+            print(f"{target.name}: {weighted}个顶点有权重，最大表面距离 {max_distance:.4f}")
+
+        self.report({'INFO'}, f"已从 {source.name} 传递权重到{len(targets)}个物体")
         return {'FINISHED'}
 
 class P_BoneMapping(bpy.types.Panel):
@@ -550,6 +612,13 @@ class P_BoneMapping(bpy.types.Panel):
         # 添加按钮
         col.operator(O_only_BoneRenameMapping.bl_idname, icon="PLAY")
 
+
+        box = layout.box()
+        # 权重传递 选择源物体，目标为所有选择的网格
+        col = box.column(align=True)
+        col.prop(context.scene, "transfer_source_mesh", text="源物体", icon="MESH_DATA")
+        col.operator(O_TransferWeights.bl_idname, icon="MOD_DATA_TRANSFER")
+
         
 
 
@@ -560,6 +629,7 @@ def register():
     bpy.utils.register_class(O_BonePosMapping)
     bpy.utils.register_class(O_BoneRenameMapping)
     bpy.utils.register_class(O_only_BoneRenameMapping)
+    bpy.utils.register_class(O_TransferWeights)
     bpy.utils.register_class(P_BoneMapping)
     ########################## Divider ##########################
     bpy.types.Scene.xbone_csv_data = bpy.props.StringProperty(
@@ -603,6 +673,11 @@ def register():
         type=bpy.types.Object, 
         poll=ObjType.is_armature
         )
+    bpy.types.Scene.transfer_source_mesh = bpy.props.PointerProperty(
+        description="选择提供权重的网格",
+        type=bpy.types.Object, 
+        poll=ObjType.is_mesh
+        )
     ########################## Divider ##########################
     bpy.types.Scene.simple_main_column = bpy.props.IntProperty(
         name="主骨骼",
@@ -686,6 +761,7 @@ def unregister():
     bpy.utils.unregister_class(O_BonePosMapping)
     bpy.utils.unregister_class(O_BoneRenameMapping)
     bpy.utils.unregister_class(O_only_BoneRenameMapping)    
+    bpy.utils.unregister_class(O_TransferWeights)
     bpy.utils.unregister_class(P_BoneMapping)
 
     del bpy.types.Scene.xbone_csv_data
@@ -697,6 +773,7 @@ def unregister():
     del bpy.types.Scene.rename_source_armature
     del bpy.types.Scene.rename_target_armature
     del bpy.types.Scene.rename_armature
+    del bpy.types.Scene.transfer_source_mesh
     
 
     del bpy.types.Scene.simple_main_column
@@ -1,6 +1,9 @@
 # type: ignore
 import bpy 
 import re
+from ..通用工具.权重矩阵 import get_weight_matrix, merge_vertex_groups_batch, limit_vertex_influences
+from ..通用工具.骨架索引 import get_deformed_meshes
+from ..通用工具.骨骼重命名 import bulk_rename_bones
 
 ########################## Divider ##########################
 
@@ -48,55 +51,121 @@ class O_VertexGroupsDelNone(bpy.types.Operator):
                 # 获取所有的顶点组
                 vertex_groups = obj.vertex_groups
 
-                # 获取网格数据
-                mesh = obj.data
-
-                # 创建一个字典来存储顶点组的信息
-                vertex_group_info = {}
-                for group in vertex_groups:
-                    vertex_group_info[group.name] = []
-
-                # 遍历每个顶点
-                for vertex in mesh.vertices:
-                    for group in vertex.groups: #遍历单个顶点的顶点组
-                        group_index = group.group
-                        group_name = vertex_groups[group_index].name
-                        weight = group.weight
-
-                        # 将顶点和权重信息添加到字典中
-                        vertex_group_info[group_name].append((vertex.index, weight))
+                # 一次构建稀疏权重矩阵，统计每个顶点组的成员数量
+                member_counts = get_weight_matrix(obj).group_member_counts()
+                empty_groups = [vertex_groups[i].name for i, count in enumerate(member_counts) if count == 0]
 
                 # 删除空的顶点组
-                for group_name, vertex_info in vertex_group_info.items():
-                    if not vertex_info:
-                        # 删除顶点组
-                        obj.vertex_groups.remove(obj.vertex_groups[group_name])
-                        print(f"已删除顶点组：{group_name}")
-                # 打印功能  
-                '''      
-                for group_name, vertex_info in vertex_group_info.items():
-                    print(f"顶点组: {group_name}")
-                    for vertex, weight in vertex_info:
-                        print(f"  顶点: {vertex}, 权重: {weight}")
-                '''
+                for group_name in empty_groups:
+                    # 删除顶点组
+                    obj.vertex_groups.remove(obj.vertex_groups[group_name])
+                    print(f"已删除顶点组：{group_name}")
                 print("已删除空的顶点组。")
             else:
                 print("请先选择一个Mesh对象作为活动对象。")
 
         return {'FINISHED'}
 
+class O_LimitInfluences(bpy.types.Operator):
+    bl_idname = "xbone.vertex_groups_limit_influences"
+    bl_label = "限制影响数量"
+    bl_description = "限制选择的多个物体每个顶点的骨骼影响数量，丢弃微小权重并归一化（用于游戏导出）"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_influences: bpy.props.IntProperty(
+        name="最大影响数",
+        description="每个顶点最多保留的顶点组数量",
+        default=4,
+        min=1,
+        max=32
+    )
+    epsilon: bpy.props.FloatProperty(
+        name="最小权重",
+        description="不大于该值的权重会被丢弃",
+        default=0.0001,
+        min=0.0,
+        max=1.0,
+        precision=4
+    )
+    normalize: bpy.props.BoolProperty(
+        name="归一化",
+        description="裁剪后把每个顶点的权重归一化到总和为1",
+        default=True
+    )
+    quantize: bpy.props.BoolProperty(
+        name="8位量化",
+        description="把权重量化到1/255精度，与引擎中的存储精度一致",
+        default=False
+    )
+
+    def invoke(self, context, event): # 确认窗口
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=200)
+
+    def execute(self, context):
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not meshes:
+            self.report({'ERROR'}, "请选择至少一个网格物体")
+            return {'CANCELLED'}
+
+        total_clipped = 0
+        for obj in meshes:
+            # 一次提取为稠密 V×K 数组处理，只写回变化的权重
+            clipped, changed = limit_vertex_influences(
+                obj, self.max_influences, self.epsilon, self.normalize, self.quantize)
+            total_clipped += clipped
+            print(f"{obj.name}: 裁剪{clipped}个顶点，改动{changed}个顶点")
+
+        self.report({'INFO'}, f"已处理{len(meshes)}个物体，共裁剪{total_clipped}个顶点的影响")
+        return {'FINISHED'}
+
 ########################## Divider ##########################
 
+def get_bound_meshes(context, mesh, armature):
+    """源网格与场景中所有绑定到该骨架的网格（去重）"""
+    meshes = get_deformed_meshes(armature, context.scene) if armature else []
+    if mesh and mesh not in meshes:
+        meshes.insert(0, mesh)
+    return meshes
+
+def collect_group_names(meshes, require_weight=False):
+    """所有网格的顶点组名称集合，require_weight 为True时只统计至少有一个非零权重的顶点组"""
+    names = set()
+    for obj in meshes:
+        if require_weight:
+            weight_matrix = get_weight_matrix(obj)
+            names.update(name for name, has in zip(weight_matrix.group_names, weight_matrix.group_has_weight()) if has)
+        else:
+            names.update(vg.name for vg in obj.vertex_groups)
+    return names
+
+def report_removal(operator, items, label, dry_run):
+    """打印待删除/已删除的名称列表并汇总报告"""
+    action = "将删除" if dry_run else "已删除"
+    for name in items:
+        print(f"{action}{label}：{name}")
+    operator.report({'INFO'}, f"{action}{len(items)}个{label}" + ("（预览，未修改）" if dry_run else "！"))
+
 class O_NoVgDelBone(bpy.types.Operator):
     bl_idname = "xbone.vertex_groups_no_vg_del_bone"
     bl_label = "删除无对应顶点组的骨骼"
-    bl_description = "删除选择的骨骼中无对应顶点组的骨骼"
+    bl_description = "删除选择的骨骼中在所有绑定网格上都无对应顶点组的骨骼"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: bpy.props.BoolProperty(
+        name="预览",
+        description="只报告将要删除的骨骼，不做修改",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
 
     def execute(self, context):
-        try:
-            SourceMesh = bpy.data.objects.get(context.scene.vg_source_mesh.name)
-            SourceArmature = bpy.data.objects.get(context.scene.vg_source_armature.name)
-        except:
+        SourceMesh = context.scene.vg_source_mesh
+        SourceArmature = context.scene.vg_source_armature
+        if not SourceArmature:
             self.report({'ERROR'}, "似乎没有选择对象") 
             return {'FINISHED'}
         if not context.selected_pose_bones:
@@ -106,51 +175,55 @@ class O_NoVgDelBone(bpy.types.Operator):
             self.report({'ERROR'}, "选择的骨架与进入姿态模式的骨架不同") 
             return {'FINISHED'}
         
-        del_bones = []
-        bpy.ops.object.mode_set(mode='EDIT')
-        for bone in context.selected_bones:
-            for group in SourceMesh.vertex_groups:
-                if bone.name == group.name:
-                    break
-            else:
-                del_bones.append(bone.name)
-        
-        bpy.ops.armature.select_all(action='DESELECT')
-        for bone_name in del_bones:
-            bpy.ops.object.select_pattern(pattern=bone_name)
-            print(f"已删除{bone_name}骨骼")
-        bpy.ops.armature.delete()
+        # 所有绑定网格的顶点组名称集合，O(B+G) 查找
+        meshes = get_bound_meshes(context, SourceMesh, SourceArmature)
+        if not meshes:
+            self.report({'ERROR'}, "没有找到绑定到该骨架的网格")
+            return {'FINISHED'}
+        group_names = collect_group_names(meshes, context.scene.vg_require_weight)
+        del_bones = [bone.name for bone in context.selected_pose_bones if bone.name not in group_names]
 
-        bpy.ops.object.mode_set(mode='POSE')
-        self.report({'INFO'}, f"已删除{len(del_bones)}个无对应顶点组的骨骼！")
+        if not self.dry_run and del_bones:
+            # 一次编辑模式完成全部删除
+            bpy.ops.object.mode_set(mode='EDIT')
+            edit_bones = SourceArmature.data.edit_bones
+            for bone_name in del_bones:
+                edit_bones.remove(edit_bones[bone_name])
+            bpy.ops.object.mode_set(mode='POSE')
+
+        report_removal(self, del_bones, "无对应顶点组的骨骼", self.dry_run)
         return {'FINISHED'}
 
 class O_NoBoneDelVg(bpy.types.Operator):
     bl_idname = "xbone.vertex_groups_no_bone_del_vg"
     bl_label = "删除无对应骨骼的顶点组"
-    bl_description = "删除顶点组中无对应骨骼的顶点组"
+    bl_description = "删除所有绑定网格中无对应骨骼的顶点组"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: bpy.props.BoolProperty(
+        name="预览",
+        description="只报告将要删除的顶点组，不做修改",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
     
     def execute(self, context):
-        try:
-            SourceMesh = bpy.data.objects.get(context.scene.vg_source_mesh.name)
-            SourceArmature = bpy.data.objects.get(context.scene.vg_source_armature.name)
-        except:
+        SourceMesh = context.scene.vg_source_mesh
+        SourceArmature = context.scene.vg_source_armature
+        if not SourceMesh or not SourceArmature:
             self.report({'ERROR'}, "似乎没有选择对象") 
             return {'FINISHED'}
         
+        bone_names = {bone.name for bone in SourceArmature.data.bones}
         del_groups = []
-        for group in SourceMesh.vertex_groups:
-            for bone in SourceArmature.data.bones:
-                if group.name == bone.name:
-                    break
-            else:
-                del_groups.append(group.name)
-                SourceMesh.vertex_groups.remove(group)
-        
-        for group_name in del_groups:
-            print(f"已删除{group_name}顶点组")
-
-        self.report({'INFO'}, f"已删除{len(del_groups)}个无对应骨骼的顶点组！")
+        for obj in get_bound_meshes(context, SourceMesh, SourceArmature):
+            stale = [vg for vg in obj.vertex_groups if vg.name not in bone_names]
+            del_groups += [f"{obj.name}/{vg.name}" for vg in stale]
+            if not self.dry_run:
+                for vg in stale:
+                    obj.vertex_groups.remove(vg)
+
+        report_removal(self, del_groups, "无对应骨骼的顶点组", self.dry_run)
         return {'FINISHED'}
 
 ########################## Divider ##########################
@@ -167,39 +240,27 @@ class O_AddBoneNumber(bpy.types.Operator):
         except:
             self.report({'ERROR'}, "似乎没有选择对象") 
             return {'FINISHED'}
-        # 创建一个字典来存储顶点组的信息
-        vertex_group_info = {}
-        for group in SourceMesh.vertex_groups:
-            vertex_group_info[group.name] = []
-
-        # 遍历每个顶点
-        for vertex in SourceMesh.data.vertices:
-            for group in vertex.groups: #遍历单个顶点的顶点组
-                group_index = group.group
-                group_name = SourceMesh.vertex_groups[group_index].name
-                weight = group.weight
-
-                # 将顶点和权重信息添加到字典中
-                vertex_group_info[group_name].append((vertex.index, weight))
-
-        # 添加编号
+        # 一次构建稀疏权重矩阵，得到有成员的顶点组名称
+        weight_matrix = get_weight_matrix(SourceMesh)
+        member_counts = weight_matrix.group_member_counts()
+        weighted_groups = {name for name, count in zip(weight_matrix.group_names, member_counts) if count > 0}
+
+        # 先计算完整的 旧名称→新名称 映射，再一次批量重命名
         bpy.ops.object.mode_set(mode='OBJECT')
         bpy.context.view_layer.objects.active = SourceArmature
         bpy.ops.object.mode_set(mode='POSE')
-        bone_number = 0
+        pattern = re.compile(r'^b\d+:')
+        rename_map = {}
         for bone in SourceArmature.pose.bones:
-            for group_name, vertex_info in vertex_group_info.items():
-                if bone.name == group_name and vertex_info: #如果有对应顶点组且有权重
-                    # 正则判断是否已经有编号
-                    pattern = re.compile(r'^b\d+:')
-                    if pattern.match(bone.name):
-                        bone.name = re.sub(r'^b\d+:', '', bone.name)
-                    bone_number = bone_number + 1
-                    bone.name = "b" + "{:03d}".format(bone_number) + ":" + bone.name
-                    print(f"{bone.name}")
-                    break
-
-        self.report({'INFO'}, f"已添加{bone_number}个骨骼编号！")
+            if bone.name in weighted_groups: #如果有对应顶点组且有权重
+                # 已经有编号的先去掉旧编号
+                base_name = pattern.sub('', bone.name)
+                rename_map[bone.name] = "b" + "{:03d}".format(len(rename_map) + 1) + ":" + base_name
+
+        if not bulk_rename_bones(self, SourceArmature, rename_map, get_bound_meshes(context, SourceMesh, SourceArmature)):
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"已添加{len(rename_map)}个骨骼编号！")
         return {'FINISHED'}
     
 class O_RemoveBoneNumber(bpy.types.Operator):
@@ -218,10 +279,10 @@ class O_RemoveBoneNumber(bpy.types.Operator):
         bpy.ops.object.mode_set(mode='OBJECT')
         bpy.context.view_layer.objects.active = SourceArmature
         bpy.ops.object.mode_set(mode='POSE')
-        for bone in SourceArmature.pose.bones:
-            bone.name = re.sub(r'^b\d+:', '', bone.name)
-            print(f"{bone.name}")
+        rename_map = {bone.name: re.sub(r'^b\d+:', '', bone.name) for bone in SourceArmature.pose.bones}
 
+        if not bulk_rename_bones(self, SourceArmature, rename_map, get_bound_meshes(context, SourceMesh, SourceArmature)):
+            return {'CANCELLED'}
 
         self.report({'INFO'}, "已移除骨骼编号！")
         return {'FINISHED'}
@@ -229,48 +290,75 @@ class O_RemoveBoneNumber(bpy.types.Operator):
 ########################## Divider ##########################
 
 
-def get_armature_objects(context):
-    """获取场景中所有受骨骼绑定的物体"""
-    armature_objs = []
-    for obj in context.scene.objects:
-        if obj.type == 'MESH' and obj.find_armature():
-            armature_objs.append(obj)
-    return armature_objs
-
-def merge_vertex_groups(obj, source_bone, target_bone):
-    """将源顶点组的权重合并到目标顶点组"""
-    if source_bone not in obj.vertex_groups or target_bone not in obj.vertex_groups:
-        return
-    
-    # 获取网格数据
-    mesh = obj.data
-    vg_source = obj.vertex_groups[source_bone]
-    vg_target = obj.vertex_groups[target_bone]
-    
-    # 为每个顶点合并权重
-    for v in mesh.vertices:
-        try:
-            # 获取源权重
-            for g in v.groups:
-                if g.group == vg_source.index:
-                    source_weight = g.weight
-                    break
-            else:
-                continue
-                
-            # 获取目标权重
-            for g in v.groups:
-                if g.group == vg_target.index:
-                    target_weight = g.weight
-                    # 合并权重（简单相加）
-                    g.weight = source_weight + target_weight
-                    break
-            else:
-                # 如果目标顶点组没有权重，则添加
-                vg_target.add([v.index], source_weight, 'REPLACE')
-                
-        except Exception as e:
-            print(f"Error merging vertex groups for {obj.name}: {e}")
+def get_armature_objects(context, armature):
+    """获取场景中骨架修改器指向该骨架的网格物体（使用缓存的骨架索引）"""
+    return get_deformed_meshes(armature, context.scene)
+
+def plan_bone_collapse(armature, bone_names, active_name=None):
+    """计算骨骼合并方案（不修改数据）
+
+    active_name 为None时合并到最近的未删除父级，否则全部合并到活动骨骼。
+    返回 (合并映射 {被删除骨骼: 目标骨骼}, 重新指定父级 {子骨骼: 新父级或None}, 跳过的骨骼)
+    """
+    bones = armature.data.bones
+    selected = set(bone_names)
+    merge_map = {}
+    skipped = []
+
+    if active_name is None:
+        # 没有父级的骨骼保留，其余选择的骨骼都被删除
+        deleted = {name for name in selected if bones[name].parent}
+        skipped = sorted(selected - deleted)
+
+        def survivor(bone):
+            while bone is not None and bone.name in deleted:
+                bone = bone.parent
+            return bone
+
+        for name in deleted:
+            merge_map[name] = survivor(bones[name].parent).name
+    else:
+        deleted = selected - {active_name}
+        for name in deleted:
+            merge_map[name] = active_name
+
+    # 活动骨骼自身及其祖先不能接到活动骨骼下，否则形成循环
+    active_chain = set()
+    if active_name is not None:
+        bone = bones[active_name]
+        while bone is not None:
+            active_chain.add(bone.name)
+            bone = bone.parent
+
+    # 被删除骨骼的子骨骼：合并到父级时接到存活的祖先，合并到活动骨骼时接到活动骨骼
+    reparent = {}
+    for bone in bones:
+        if bone.name in deleted or bone.parent is None or bone.parent.name not in deleted:
+            continue
+        new_parent = merge_map[bone.parent.name]
+        if bone.name in active_chain:
+            # 接到最近的未删除祖先
+            ancestor = bone.parent
+            while ancestor is not None and ancestor.name in deleted:
+                ancestor = ancestor.parent
+            new_parent = ancestor.name if ancestor else None
+        reparent[bone.name] = new_parent
+
+    return merge_map, reparent, skipped
+
+
+def apply_bone_collapse(armature, merge_map, reparent, meshes, policy='CLAMP'):
+    """执行合并方案：每个网格一次批量合并权重，骨骼的重新指定父级与删除在一次编辑模式中完成"""
+    for obj in meshes:
+        merge_vertex_groups_batch(obj, merge_map, policy, remove_sources=True)
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature.data.edit_bones
+    for child_name, parent_name in reparent.items():
+        edit_bones[child_name].parent = edit_bones[parent_name] if parent_name else None
+    for bone_name in merge_map:
+        edit_bones.remove(edit_bones[bone_name])
+    bpy.ops.object.mode_set(mode='POSE')
 
 class BONE_OT_merge_to_parent(bpy.types.Operator):
     """将选择的骨骼合并到它们的父级骨骼"""
@@ -287,51 +375,18 @@ class BONE_OT_merge_to_parent(bpy.types.Operator):
 
     def execute(self, context):
         armature = context.active_object
-        selected_bones = context.selected_pose_bones
-        armature_objs = get_armature_objects(context)
+        selected_names = [bone.name for bone in context.selected_pose_bones]
+        armature_objs = get_armature_objects(context, armature)
         
-        # 按层级从高到低排序选择的骨骼
-        sorted_bones = sorted(selected_bones, key=lambda b: len(b.parent_recursive), reverse=True)
+        # 先解析每根骨骼最终合并到的存活祖先（考虑连续选择的骨骼链）
+        merge_map, reparent, skipped = plan_bone_collapse(armature, selected_names)
+        for bone_name in skipped:
+            self.report({'WARNING'}, f"骨骼 {bone_name} 没有父级，跳过")
         
-        for bone in sorted_bones:
-            bone_name = bone.name
-            parent_bone = bone.parent
-            
-            if not parent_bone:
-                self.report({'WARNING'}, f"骨骼 {bone_name} 没有父级，跳过")
-                continue
-                
-            parent_name = parent_bone.name
-            
-            # 处理子骨骼的父级关系
-            bpy.ops.object.mode_set(mode='EDIT')
-            edit_bone = armature.data.edit_bones[bone_name]
-            
-            # 将所有子骨骼的父级设置为当前骨骼的父级
-            for child in edit_bone.children:
-                child.parent = armature.data.edit_bones[parent_name]
-
-            # 处理顶点组
-            for obj in armature_objs:
-                # 确保源顶点组存在
-                if bone_name not in obj.vertex_groups:
-                    obj.vertex_groups.new(name=bone_name)
-                
-                # 确保目标顶点组存在
-                if parent_name not in obj.vertex_groups:
-                    obj.vertex_groups.new(name=parent_name)
-                
-                # 合并顶点组
-                merge_vertex_groups(obj, bone_name, parent_name)
-                    
-                # 删除源顶点组
-                if bone_name in obj.vertex_groups:
-                    obj.vertex_groups.remove(obj.vertex_groups[bone_name])
-            
-            # 删除骨骼
-            armature.data.edit_bones.remove(edit_bone)
-            bpy.ops.object.mode_set(mode='POSE')
+        # 一次批量合并权重，一次编辑模式完成重新指定父级和删除
+        apply_bone_collapse(armature, merge_map, reparent, armature_objs, context.scene.vg_merge_policy)
         
+        self.report({'INFO'}, f"已合并{len(merge_map)}根骨骼到父级")
         return {'FINISHED'}
 
 class BONE_OT_merge_to_active(bpy.types.Operator):
@@ -353,54 +408,170 @@ class BONE_OT_merge_to_active(bpy.types.Operator):
         armature = context.active_object
         selected_bones = context.selected_pose_bones
         active_bone = context.active_pose_bone
-        armature_objs = get_armature_objects(context)
+        armature_objs = get_armature_objects(context, armature)
         
         # 确保活动骨骼在选中的骨骼中
         if active_bone not in selected_bones:
             self.report({'ERROR'}, "活动骨骼必须在选择的骨骼中")
             return {'CANCELLED'}
-            
-        # 从选中的骨骼中移除活动骨骼
-        bones_to_merge = [b for b in selected_bones if b != active_bone]
-        active_bone_name = active_bone.name
         
-        # 按层级从高到低排序选择的骨骼
-        sorted_bones = sorted(bones_to_merge, key=lambda b: len(b.parent_recursive), reverse=True)
+        # 所有其他选择的骨骼都合并到活动骨骼
+        merge_map, reparent, _ = plan_bone_collapse(
+            armature, [bone.name for bone in selected_bones], active_bone.name)
         
-        for bone in sorted_bones:
-            bone_name = bone.name
-            
-            # 处理子骨骼的父级关系
-            bpy.ops.object.mode_set(mode='EDIT')
-            edit_bone = armature.data.edit_bones[bone_name]
-            
-            # 将所有子骨骼的父级设置为活动骨骼
-            for child in edit_bone.children:
-                child.parent = armature.data.edit_bones[active_bone_name]
-            
-            # 处理顶点组
-            for obj in armature_objs:
-                # 确保源顶点组存在
-                if bone_name not in obj.vertex_groups:
-                    obj.vertex_groups.new(name=bone_name)
-                
-                # 确保目标顶点组存在
-                if active_bone_name not in obj.vertex_groups:
-                    obj.vertex_groups.new(name=active_bone_name)
-                
-                # 合并顶点组
-                merge_vertex_groups(obj, bone_name, active_bone_name)
-                    
-                # 删除源顶点组
-                if bone_name in obj.vertex_groups:
-                    obj.vertex_groups.remove(obj.vertex_groups[bone_name])
-            
-            # 删除骨骼
-            armature.data.edit_bones.remove(edit_bone)
-            bpy.ops.object.mode_set(mode='POSE')
+        # 一次批量合并权重，一次编辑模式完成重新指定父级和删除
+        apply_bone_collapse(armature, merge_map, reparent, armature_objs, context.scene.vg_merge_policy)
         
+        self.report({'INFO'}, f"已合并{len(merge_map)}根骨骼到 {active_bone.name}")
+        return {'FINISHED'}
+
+
+# 正则合并规则项
+class VertexGroupMergeRule(bpy.types.PropertyGroup):
+    pattern: bpy.props.StringProperty(
+        name="正则",
+        description="完整匹配顶点组名称的正则表达式，例如 hair_\\d+",
+        default=""
+    )
+    target: bpy.props.StringProperty(
+        name="目标",
+        description="合并到的顶点组名称，可以使用 \\1 引用分组",
+        default=""
+    )
+
+class O_AddMergeRule(bpy.types.Operator):
+    bl_idname = "xbone.vertex_groups_add_merge_rule"
+    bl_label = "添加规则"
+    bl_description = "添加一条 正则→目标 合并规则"
+
+    def execute(self, context):
+        context.scene.vg_merge_rules.add()
+        return {'FINISHED'}
+
+class O_RemoveMergeRule(bpy.types.Operator):
+    bl_idname = "xbone.vertex_groups_remove_merge_rule"
+    bl_label = "删除规则"
+    bl_description = "删除这条合并规则"
+
+    rule_index: bpy.props.IntProperty()
+
+    def execute(self, context):
+        rules = context.scene.vg_merge_rules
+        if self.rule_index < len(rules):
+            rules.remove(self.rule_index)
+        return {'FINISHED'}
+
+def resolve_pattern_merge(names, rules):
+    """按规则顺序为每个顶点组名称求目标（第一条完整匹配的规则生效），返回 {源: 目标}
+
+    目标中引用了不存在的分组时抛出 ValueError
+    """
+    mapping = {}
+    for name in names:
+        for pattern, target in rules:
+            match = pattern.fullmatch(name)
+            if match:
+                try:
+                    new_name = match.expand(target)
+                except (re.error, IndexError) as e:
+                    raise ValueError(f"规则 {pattern.pattern} → {target} 的目标无效: {e}") from e
+                if new_name and new_name != name:
+                    mapping[name] = new_name
+                break
+    return mapping
+
+class O_PatternMerge(bpy.types.Operator):
+    bl_idname = "xbone.vertex_groups_pattern_merge"
+    bl_label = "按规则合并"
+    bl_description = "按 正则→目标 规则合并所有选择网格的顶点组（每个网格一次批量合并），可同时删除被合并的骨骼"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    delete_bones: bpy.props.BoolProperty(
+        name="删除骨骼",
+        description="在一次编辑模式中删除被合并顶点组对应的骨骼，子骨骼接到最近的保留祖先",
+        default=False
+    )
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self, width=200)
+
+    def execute(self, context):
+        try:
+            rules = [(re.compile(rule.pattern), rule.target) for rule in context.scene.vg_merge_rules
+                     if rule.pattern and rule.target]
+        except re.error as e:
+            self.report({'ERROR'}, f"正则表达式错误: {e}")
+            return {'CANCELLED'}
+        if not rules:
+            self.report({'ERROR'}, "请先添加合并规则")
+            return {'CANCELLED'}
+
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not meshes:
+            self.report({'ERROR'}, "请选择至少一个网格物体")
+            return {'CANCELLED'}
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        # 先为全部网格求出合并方案，规则无效时不做任何修改
+        try:
+            mappings = [(obj, resolve_pattern_merge([vg.name for vg in obj.vertex_groups], rules)) for obj in meshes]
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        merged_bones = {}  # 骨架 → {被合并的名称: 目标名称}
+        total = 0
+        for obj, mapping in mappings:
+            if not mapping:
+                continue
+            merge_vertex_groups_batch(obj, mapping, context.scene.vg_merge_policy, remove_sources=True)
+            total += len(mapping)
+            print(f"{obj.name}: 合并{len(mapping)}个顶点组到 {', '.join(sorted(set(mapping.values())))}")
+            armature = obj.find_armature()
+            if armature:
+                merged_bones.setdefault(armature, {}).update(mapping)
+
+        deleted = 0
+        if self.delete_bones:
+            active = context.view_layer.objects.active
+            for armature, merge_map in merged_bones.items():
+                deleted += self._delete_bones(context, armature, merge_map)
+            context.view_layer.objects.active = active
+
+        self.report({'INFO'}, f"已合并{total}个顶点组" + (f"，删除{deleted}根骨骼" if self.delete_bones else ""))
         return {'FINISHED'}
 
+    def _delete_bones(self, context, armature, merge_map):
+        """子骨骼接到最近的保留祖先后，在一次编辑模式中删除骨骼
+
+        未选择的绑定网格仍有对应顶点组的骨骼不删除，否则这些网格会失去形变
+        """
+        bones = armature.data.bones
+        still_used = collect_group_names(get_bound_meshes(context, None, armature))
+        for name in sorted(still_used.intersection(merge_map)):
+            print(f"保留骨骼：{name}（其他绑定网格仍有该顶点组）")
+        merge_map = {name: target for name, target in merge_map.items()
+                     if name in bones and name not in still_used and name not in merge_map.values()}
+        deleted = set(merge_map)
+        if not deleted:
+            return 0
+
+        reparent = {}
+        for bone in bones:
+            if bone.name in deleted or bone.parent is None or bone.parent.name not in deleted:
+                continue
+            ancestor = bone.parent
+            while ancestor is not None and ancestor.name in deleted:
+                ancestor = ancestor.parent
+            reparent[bone.name] = ancestor.name if ancestor else None
+
+        context.view_layer.objects.active = armature
+        # 权重已经合并过，这里不再传入网格
+        apply_bone_collapse(armature, merge_map, reparent, [])
+        bpy.ops.object.mode_set(mode='OBJECT')
+        return len(deleted)
 
 ########################## Divider ##########################
 
@@ -421,9 +592,23 @@ class P_VertexGroups(bpy.types.Panel):
         col = layout.column(align=True)
         col.operator(O_VertexGroupsDelAll.bl_idname, text=O_VertexGroupsDelAll.bl_label, icon="GROUP_VERTEX")       
         col.operator(O_VertexGroupsDelNone.bl_idname, text=O_VertexGroupsDelNone.bl_label, icon="GROUP_VERTEX")
+        col.operator(O_LimitInfluences.bl_idname, text=O_LimitInfluences.bl_label, icon="MOD_VERTEX_WEIGHT")
         row = col.row(align=True)
         row.operator(BONE_OT_merge_to_parent.bl_idname, text="合并到父级", icon="BONE_DATA")
         row.operator(BONE_OT_merge_to_active.bl_idname, text="合并到活动", icon="BONE_DATA")
+        row.prop(context.scene, "vg_merge_policy", text="")
+
+        # 正则合并规则
+        box = layout.box()
+        col = box.column(align=True)
+        row = col.row(align=True)
+        row.operator(O_AddMergeRule.bl_idname, text=O_AddMergeRule.bl_label, icon='ADD')
+        row.operator(O_PatternMerge.bl_idname, text=O_PatternMerge.bl_label, icon="AUTOMERGE_ON")
+        for i, rule in enumerate(context.scene.vg_merge_rules):
+            row = col.row(align=True)
+            row.prop(rule, "pattern", text="")
+            row.prop(rule, "target", text="")
+            row.operator(O_RemoveMergeRule.bl_idname, text="", icon='X').rule_index = i
 
         box = layout.box()
         col = box.column(align=True)
@@ -432,8 +617,13 @@ class P_VertexGroups(bpy.types.Panel):
         col.label(text="顶点组数量:")
         if context.scene.vg_source_mesh:
             col.label(text=f"{len(context.scene.vg_source_mesh.vertex_groups)}")
-        col.operator(O_NoVgDelBone.bl_idname, text=O_NoVgDelBone.bl_label, icon="BONE_DATA")       
-        col.operator(O_NoBoneDelVg.bl_idname, text=O_NoBoneDelVg.bl_label, icon="GROUP_VERTEX")
+        col.prop(context.scene, "vg_require_weight")
+        row = col.row(align=True)
+        row.operator(O_NoVgDelBone.bl_idname, text=O_NoVgDelBone.bl_label, icon="BONE_DATA")
+        row.operator(O_NoVgDelBone.bl_idname, text="", icon="VIEWZOOM").dry_run = True
+        row = col.row(align=True)
+        row.operator(O_NoBoneDelVg.bl_idname, text=O_NoBoneDelVg.bl_label, icon="GROUP_VERTEX")
+        row.operator(O_NoBoneDelVg.bl_idname, text="", icon="VIEWZOOM").dry_run = True
         row = col.row(align=True)
         row.operator(O_AddBoneNumber.bl_idname, text=O_AddBoneNumber.bl_label)
         row.operator(O_RemoveBoneNumber.bl_idname, text=O_RemoveBoneNumber.bl_label)
@@ -444,28 +634,59 @@ class P_VertexGroups(bpy.types.Panel):
 def register():
     bpy.utils.register_class(O_VertexGroupsDelAll)
     bpy.utils.register_class(O_VertexGroupsDelNone)
+    bpy.utils.register_class(O_LimitInfluences)
     bpy.utils.register_class(O_NoVgDelBone)
     bpy.utils.register_class(O_NoBoneDelVg)
     bpy.utils.register_class(O_AddBoneNumber)
     bpy.utils.register_class(O_RemoveBoneNumber)
     bpy.utils.register_class(BONE_OT_merge_to_parent)
     bpy.utils.register_class(BONE_OT_merge_to_active)
+    bpy.utils.register_class(VertexGroupMergeRule)
+    bpy.utils.register_class(O_AddMergeRule)
+    bpy.utils.register_class(O_RemoveMergeRule)
+    bpy.utils.register_class(O_PatternMerge)
     bpy.utils.register_class(P_VertexGroups)
     
 
     bpy.types.Scene.vg_source_mesh = bpy.props.PointerProperty(type=bpy.types.Object, poll=ObjType.is_mesh)
     bpy.types.Scene.vg_source_armature = bpy.props.PointerProperty(type=bpy.types.Object, poll=ObjType.is_armature)
+    bpy.types.Scene.vg_merge_rules = bpy.props.CollectionProperty(
+        type=VertexGroupMergeRule
+    )
+    bpy.types.Scene.vg_require_weight = bpy.props.BoolProperty(
+        name="仅统计有权重的顶点组",
+        description="删除无对应顶点组的骨骼时，只把至少有一个非零权重的顶点组视为存在",
+        default=False
+    )
+    bpy.types.Scene.vg_merge_policy = bpy.props.EnumProperty(
+        name="合并策略",
+        description="合并顶点组时权重相加后的处理方式",
+        items=[
+            ('CLAMP', '相加限制', '权重相加后限制到1'),
+            ('NORMALIZE', '相加归一', '权重相加后把受影响顶点的所有权重归一化到总和为1'),
+            ('ADD', '直接相加', '权重直接相加')
+        ],
+        default='CLAMP'
+    )
 
 def unregister():
     bpy.utils.unregister_class(O_VertexGroupsDelAll)
     bpy.utils.unregister_class(O_VertexGroupsDelNone)
+    bpy.utils.unregister_class(O_LimitInfluences)
     bpy.utils.unregister_class(O_NoVgDelBone)
     bpy.utils.unregister_class(O_NoBoneDelVg)
     bpy.utils.unregister_class(O_AddBoneNumber)
     bpy.utils.unregister_class(O_RemoveBoneNumber)
     bpy.utils.unregister_class(BONE_OT_merge_to_parent)
     bpy.utils.unregister_class(BONE_OT_merge_to_active)
+    bpy.utils.unregister_class(VertexGroupMergeRule)
+    bpy.utils.unregister_class(O_AddMergeRule)
+    bpy.utils.unregister_class(O_RemoveMergeRule)
+    bpy.utils.unregister_class(O_PatternMerge)
     bpy.utils.unregister_class(P_VertexGroups)
 
     del bpy.types.Scene.vg_source_mesh
-    del bpy.types.Scene.vg_source_armature
\ No newline at end of file
+    del bpy.types.Scene.vg_source_armature
+    del bpy.types.Scene.vg_merge_policy
+    del bpy.types.Scene.vg_require_weight
+    del bpy.types.Scene.vg_merge_rules
\ No newline at end of file
@@ -5,6 +5,7 @@ from mathutils import Euler, Matrix, Vector, Quaternion
 import os 
 import csv
 from bpy_extras.io_utils import ImportHelper
+from ..通用工具.骨架索引 import get_deformed_meshes
 
 ########################## Divider ##########################
 
@@ -328,8 +329,8 @@ class O_BonePoseApply(bpy.types.Operator):
 
         # 创建一个列表来存储满足条件的对象
         objects_to_modify = []
-        # 遍历骨架的子级物体
-        for child in armature.children:
+        # 只遍历骨架修改器指向该骨架的网格（骨架索引，包含非子级的绑定网格）
+        for child in get_deformed_meshes(armature, context.scene):
             # 将子级物体设为活动对象
             bpy.context.view_layer.objects.active = child
             bpy.ops.object.shape_key_add(from_mix=False) # 创建一个形态键，避免下一句bug